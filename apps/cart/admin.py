@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Cart, CartItem
+from .services import CartService
 
 
 class CartItemInline(admin.TabularInline):
@@ -12,16 +13,15 @@ class CartItemInline(admin.TabularInline):
 
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
-    list_display = ['id', 'user', 'get_items_count', 'created_at', 'updated_at']
+    list_display = ['id', 'user', 'item_count', 'subtotal', 'created_at', 'updated_at']
     list_filter = ['created_at', 'updated_at']
     search_fields = ['user__email', 'user__first_name', 'user__last_name']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['item_count', 'subtotal', 'created_at', 'updated_at']
     inlines = [CartItemInline]
 
-    def get_items_count(self, obj):
-        return obj.items.count()
-
-    get_items_count.short_description = 'Items Count'
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        CartService.refresh_summaries(form.instance.id)
 
 
 @admin.register(CartItem)
@@ -30,3 +30,17 @@ class CartItemAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['cart__user__email', 'product__name']
     readonly_fields = ['price_snapshot', 'created_at']
+
+    def save_model(self, request, obj, form, change):
+        previous_cart_id = form.initial.get('cart')
+        super().save_model(request, obj, form, change)
+        CartService.refresh_summaries(*{previous_cart_id, obj.cart_id} - {None})
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        CartService.refresh_summaries(obj.cart_id)
+
+    def delete_queryset(self, request, queryset):
+        cart_ids = set(queryset.values_list('cart_id', flat=True))
+        super().delete_queryset(request, queryset)
+        CartService.refresh_summaries(*cart_ids)
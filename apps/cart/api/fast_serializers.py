@@ -0,0 +1,127 @@
+from collections import defaultdict
+
+from apps.core.serializers import format_datetime, format_decimal
+from apps.products.models import Product
+from ..models import CartItem
+
+LINE_ITEM_VALUES = (
+    'id', 'quantity', 'price_snapshot', 'created_at', 'product_id', 'product__name', 'product__slug',
+    'product__price', 'product__stock_quantity', 'product__is_active',
+)
+
+
+def serialize_line_item(row: dict) -> dict:
+    """
+    Same output as CartItemSerializer and OrderItemSerializer
+    Args:
+        row: values() row with LINE_ITEM_VALUES
+    """
+    return {
+        'id': row['id'],
+        'product': {
+            'id': row['product_id'],
+            'name': row['product__name'],
+            'slug': row['product__slug'],
+            'price': format_decimal(row['product__price']),
+            'stock_quantity': row['product__stock_quantity'],
+            'is_active': row['product__is_active'],
+        },
+        'quantity': row['quantity'],
+        'price_snapshot': format_decimal(row['price_snapshot']),
+        # Left as Decimal like the SerializerMethodField it mirrors
+        'item_total': row['quantity'] * row['price_snapshot'],
+        'created_at': format_datetime(row['created_at']),
+    }
+
+
+def serialize_carts(carts: list) -> list:
+    """
+    Read-only equivalent of CartSerializer
+    Args:
+        carts: Cart instances, optionally annotated by selectors.get_cart_for_read
+    Returns:
+        List of dicts equal to CartSerializer(carts, many=True).data
+    """
+    items = defaultdict(list)
+    # Unsaved carts stand in for users without one and have no items to load
+    cart_ids = [cart.id for cart in carts if cart.id is not None]
+    rows = []
+    if cart_ids:
+        rows = CartItem.objects.filter(cart_id__in=cart_ids).order_by('id').values('cart_id', *LINE_ITEM_VALUES)
+    for row in rows:
+        items[row['cart_id']].append(row)
+
+    return [
+        {
+            'id': cart.id,
+            'user': cart.user_id,
+            'created_at': format_datetime(cart.created_at),
+            'updated_at': format_datetime(cart.updated_at),
+            'items': [serialize_line_item(row) for row in items[cart.id]],
+            **get_cart_totals(cart, items[cart.id]),
+        }
+        for cart in carts
+    ]
+
+
+def get_cart_totals(cart, rows: list) -> dict:
+    """Totals aggregated by the database when the cart was annotated, summed from its rows otherwise"""
+    if hasattr(cart, 'cart_total'):
+        return {'total_items': cart.total_items, 'cart_total': cart.cart_total}
+    return {
+        'total_items': sum(row['quantity'] for row in rows),
+        'cart_total': sum(row['quantity'] * row['price_snapshot'] for row in rows),
+    }
+
+
+def serialize_cart_state(user_id: int, state: dict) -> dict:
+    """
+    CartSerializer-shaped representation of a cached cart, line IDs are product IDs
+    Args:
+        user_id: Owner of the cart
+        state: Cart state from CachedCartStore
+    Returns:
+        Dict with the same keys and formats as CartSerializer output
+    """
+    products = {
+        product['id']: product for product in Product.objects.filter(id__in=state['lines']).values(
+            'id', 'name', 'slug', 'price', 'stock_quantity', 'is_active',
+        )
+    }
+    rows = [
+        serialize_line_state(product_id, line, products[product_id])
+        for product_id, line in state['lines'].items() if product_id in products
+    ]
+    return {
+        'id': state['cart_id'],
+        'user': user_id,
+        'created_at': format_datetime(state['created_at']),
+        'updated_at': format_datetime(state['updated_at']),
+        'items': [serialize_line_item(row) for row in rows],
+        'total_items': sum(row['quantity'] for row in rows),
+        'cart_total': sum(row['quantity'] * row['price_snapshot'] for row in rows),
+    }
+
+
+def serialize_cached_line(product_id: int, line: dict) -> dict:
+    """Same output as CartItemSerializer for one cached cart line"""
+    product = Product.objects.values('name', 'slug', 'price', 'stock_quantity', 'is_active').get(id=product_id)
+    return serialize_line_item(serialize_line_state(product_id, line, product))
+
+
+def serialize_line_state(product_id: int, line: dict, product: dict) -> dict:
+    """
+    Build a LINE_ITEM_VALUES row from a cached cart line
+    Args:
+        product_id: Product of the line, also used as the line ID
+        line: Line from a cart state
+        product: values() row of the product
+    """
+    return {
+        'id': product_id,
+        'quantity': line['quantity'],
+        'price_snapshot': line['price_snapshot'],
+        'created_at': line['created_at'],
+        'product_id': product_id,
+        **{f'product__{name}': product[name] for name in ('name', 'slug', 'price', 'stock_quantity', 'is_active')},
+    }
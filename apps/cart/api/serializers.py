@@ -1,7 +1,12 @@
 from rest_framework import serializers
 
+from apps.core.serializers import SparseFieldsetMixin
+
+from ..batch import ADD, BATCH_OPERATIONS, REMOVE
 from ..models import Cart, CartItem
 
+MAX_BATCH_OPERATIONS = 100
+
 
 class ProductMiniSerializer(serializers.Serializer):
     id = serializers.IntegerField()
@@ -26,7 +31,7 @@ class CartItemSerializer(serializers.ModelSerializer):
         return obj.quantity * obj.price_snapshot
 
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     total_items = serializers.SerializerMethodField()
     cart_total = serializers.SerializerMethodField()
@@ -35,9 +40,42 @@ class CartSerializer(serializers.ModelSerializer):
         model = Cart
         fields = ['id', 'user', 'created_at', 'updated_at', 'items', 'total_items', 'cart_total']
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        sparse_field_sources = {
+            'items': ['items__product'],
+            'total_items': ['items'],
+            'cart_total': ['items'],
+        }
 
     def get_total_items(self, obj):
+        if hasattr(obj, 'total_items'):
+            return obj.total_items
         return sum(item.quantity for item in obj.items.all())
 
     def get_cart_total(self, obj):
+        if hasattr(obj, 'cart_total'):
+            return obj.cart_total
         return sum(item.quantity * item.price_snapshot for item in obj.items.all())
+
+
+class CartSummarySerializer(serializers.Serializer):
+    item_count = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class CartBatchOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=BATCH_OPERATIONS)
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        if attrs['op'] == REMOVE:
+            attrs['quantity'] = 0
+        elif 'quantity' not in attrs:
+            raise serializers.ValidationError({'quantity': "This field is required."})
+        elif attrs['op'] == ADD and attrs['quantity'] == 0:
+            raise serializers.ValidationError({'quantity': "Quantity must be greater than 0"})
+        return attrs
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartBatchOperationSerializer(many=True, allow_empty=False, max_length=MAX_BATCH_OPERATIONS)
@@ -2,14 +2,18 @@ from django.urls import path
 
 from .views import (
     CartView,
+    CartSummaryView,
     AddCartItemView,
     UpdateRemoveCartItemView,
     ClearCartView,
+    CartBatchView,
 )
 
 urlpatterns = [
     path('', CartView.as_view(), name='cart'),
+    path('summary/', CartSummaryView.as_view(), name='cart-summary'),
     path('items/', AddCartItemView.as_view(), name='add-cart-item'),
     path('items/<int:item_id>/', UpdateRemoveCartItemView.as_view(), name='update-remove-cart-item'),
     path('clear/', ClearCartView.as_view(), name='clear-cart'),
+    path('batch/', CartBatchView.as_view(), name='cart-batch'),
 ]
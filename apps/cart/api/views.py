@@ -4,22 +4,54 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.mixins import SparseFieldsetViewMixin
+from .fast_serializers import serialize_cached_line, serialize_cart_state, serialize_carts
 from .serializers import (
+    CartBatchSerializer,
     CartItemSerializer,
     CartSerializer,
+    CartSummarySerializer,
 )
 from .. import selectors
+from ..models import Cart
 from ..services import CartService
+from ..stores import CachedCartStore, cart_cache_enabled
 
 
-class CartView(generics.RetrieveAPIView):
+class CartView(SparseFieldsetViewMixin, generics.RetrieveAPIView):
     serializer_class = CartSerializer
+    fast_serializer = serialize_carts
     permission_classes = [IsAuthenticated]
 
-    def get_object(self):
-        user = self.request.user
-        cart = selectors.get_user_cart(user)
-        return cart
+    def retrieve(self, request, *args, **kwargs):
+        if cart_cache_enabled():
+            state = CachedCartStore.get_state(request.user.id)
+            return Response(self.select_fields(serialize_cart_state(request.user.id, state)))
+
+        cart = selectors.get_cart_for_read(request.user)
+        if cart is None:
+            # Reading never creates a cart, users without one see an empty cart
+            return Response(self.select_fields(serialize_carts([Cart(user=request.user)])[0]))
+
+        if not self.use_fast_serializer():
+            CartSerializer.prefetch_instance(cart, request)
+        return Response(self.get_serializer(cart).data)
+
+    def select_fields(self, data):
+        """Apply ?fields= and ?omit= to a representation built without CartSerializer"""
+        selected = CartSerializer.get_selected_field_names(self.request, CartSerializer().get_fields())
+        if selected is None:
+            return data
+        return {name: value for name, value in data.items() if name in selected}
+
+
+class CartSummaryView(APIView):
+    """Item count and subtotal for the cart badge, read from the cart row alone"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        summary = CartService.get_summary(request.user)
+        return Response(CartSummarySerializer(summary).data, status=status.HTTP_200_OK)
 
 
 class AddCartItemView(APIView):
@@ -44,6 +76,8 @@ class AddCartItemView(APIView):
             )
         try:
             cart = CartService.add_product(user, product_id, quantity)
+            if cart_cache_enabled():
+                return Response(serialize_cart_state(user.id, cart), status=status.HTTP_200_OK)
             serializer = CartSerializer(cart)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except ValidationError as e:
@@ -94,6 +128,8 @@ class UpdateRemoveCartItemView(APIView):
                         status=status.HTTP_404_NOT_FOUND
                     )
 
+            if cart_cache_enabled():
+                return Response(serialize_cached_line(item_id, cart_item), status=status.HTTP_200_OK)
             serializer = CartItemSerializer(cart_item)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except ValidationError as e:
@@ -146,3 +182,22 @@ class ClearCartView(APIView):
                 {'error': 'An unexpected error occurred'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class CartBatchView(APIView):
+    """Apply several add, set and remove operations to the cart at once, all or nothing"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            cart = CartService.apply_batch(request.user, serializer.validated_data['operations'])
+        except ValidationError as e:
+            return Response(
+                {'errors': e.messages},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if cart_cache_enabled():
+            return Response(serialize_cart_state(request.user.id, cart), status=status.HTTP_200_OK)
+        return Response(serialize_carts([cart])[0], status=status.HTTP_200_OK)
@@ -0,0 +1,52 @@
+from django.core.exceptions import ValidationError
+
+ADD, SET, REMOVE = 'add', 'set', 'remove'
+BATCH_OPERATIONS = (ADD, SET, REMOVE)
+
+
+def resolve_batch(quantities: dict, operations: list) -> dict:
+    """
+    Apply cart operations in order to the current line quantities
+    Args:
+        quantities: Dict of product ID -> quantity currently in the cart
+        operations: List of dicts with op ('add', 'set' or 'remove'), product_id and quantity
+    Returns:
+        Dict of product ID -> final quantity for every product the operations touch, 0 meaning removed
+    """
+    final = {}
+    for operation in operations:
+        product_id = operation['product_id']
+        current = final.get(product_id, quantities.get(product_id, 0))
+        if operation['op'] == ADD:
+            final[product_id] = current + operation['quantity']
+        elif operation['op'] == SET:
+            final[product_id] = operation['quantity']
+        else:
+            final[product_id] = 0
+    return final
+
+
+def validate_batch(final: dict, quantities: dict, products: dict) -> None:
+    """
+    Check every line a batch grows against the product's availability and stock
+    Args:
+        final: Result of resolve_batch
+        quantities: Dict of product ID -> quantity currently in the cart
+        products: Dict of product ID -> Product for every product in final
+    Raises:
+        ValidationError listing every line that cannot be applied
+    """
+    errors = []
+    for product_id, quantity in final.items():
+        if quantity <= quantities.get(product_id, 0):
+            # Shrinking or removing a line never needs stock
+            continue
+        product = products.get(product_id)
+        if product is None:
+            errors.append(f"Product {product_id} not found")
+        elif not product.is_active:
+            errors.append(f"Product '{product.name}' is not available")
+        elif product.stock_quantity < quantity:
+            errors.append(f"Not enough stock for {product.name}. Available: {product.stock_quantity}")
+    if errors:
+        raise ValidationError(errors)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from ...stores import CachedCartStore, cart_cache_enabled
+
+
+class Command(BaseCommand):
+    help = "Write carts changed in the cache back to the database. Schedule it every few seconds with CART_BACKEND=cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help="Maximum number of queued carts to process")
+
+    def handle(self, *args, **options):
+        if not cart_cache_enabled():
+            self.stdout.write("CART_BACKEND is not 'cache', nothing to flush")
+            return
+        written = CachedCartStore.flush_dirty(options['limit'])
+        self.stdout.write(self.style.SUCCESS(f"Flushed {written} carts"))
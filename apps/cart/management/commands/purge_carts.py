@@ -0,0 +1,22 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services import CartService
+
+
+class Command(BaseCommand):
+    help = "Delete carts idle past CART_TTL_DAYS, and empty ones past CART_EMPTY_TTL_DAYS, in chunks. Schedule it daily"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl-days', type=int, help="Idle days after which any cart is deleted")
+        parser.add_argument('--empty-ttl-days', type=int, help="Idle days after which a cart without items is deleted")
+        parser.add_argument('--chunk-size', type=int, help="Carts deleted per transaction")
+
+    def handle(self, *args, **options):
+        try:
+            purged = CartService.purge_abandoned_carts(
+                options['ttl_days'], options['empty_ttl_days'], options['chunk_size']
+            )
+        except ValidationError as exc:
+            raise CommandError(exc.messages[0])
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged['carts']} carts and {purged['items']} cart items"))
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.2 on 2026-10-17 02:57
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_cart_summaries(apps, schema_editor):
+    Cart = apps.get_model('cart', 'Cart')
+    CartItem = apps.get_model('cart', 'CartItem')
+    subtotal_field = DecimalField(max_digits=12, decimal_places=2)
+    totals = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart').annotate(
+        count=Sum('quantity'),
+        amount=Sum(F('quantity') * F('price_snapshot'), output_field=subtotal_field),
+    )
+    Cart.objects.update(
+        item_count=Coalesce(Subquery(totals.values('count')), 0),
+        subtotal=Coalesce(Subquery(totals.values('amount')), 0, output_field=subtotal_field),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_alter_cartitem_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_cart_summaries, migrations.RunPython.noop),
+    ]
@@ -6,9 +6,18 @@ from ..products.models import Product
 
 class Cart(models.Model):
     user = models.ForeignKey(CustomUser, related_name='carts', on_delete=models.CASCADE)
+    # Totals of the cart's items, kept up to date by CartService so badges read one row
+    item_count = models.PositiveIntegerField(default=0, editable=False)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Abandoned cart purge, see CartService.purge_abandoned_carts
+            models.Index(fields=['updated_at']),
+        ]
+
     def __str__(self):
         return f"Cart of {self.user.first_name} created on {self.created_at}"
 
@@ -1,3 +1,5 @@
+from django.db.models import DecimalField, F, Sum
+
 from .models import Cart, CartItem
 
 
@@ -12,3 +14,27 @@ def get_user_cart_with_items(user):
     cart = get_user_cart(user)
     items = CartItem.objects.filter(cart=cart).select_related('product')
     return cart, items
+
+
+def get_cart_for_read(user):
+    """
+    Get the user's cart with its totals, without ever creating it
+    Args:
+        user: CustomUser instance
+    Returns:
+        Cart annotated with total_items and cart_total computed by one aggregate query (0 when empty),
+        or None if the user has no cart
+    """
+    cart = Cart.objects.filter(user=user).annotate(
+        total_items=Sum('items__quantity'),
+        cart_total=Sum(
+            F('items__quantity') * F('items__price_snapshot'),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    ).order_by('id').first()
+    if cart is not None:
+        # Match summing an empty item list in Python
+        cart.total_items = cart.total_items or 0
+        cart.cart_total = cart.cart_total or 0
+    return cart
+
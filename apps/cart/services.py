@@ -1,90 +1,331 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, connections, transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from . import selectors
-from .models import CartItem
+from .batch import resolve_batch, validate_batch
+from .models import Cart, CartItem
+from .stores import CachedCartService, cart_cache_enabled
 from ..products.models import Product
 
+# Backends that support INSERT ... ON CONFLICT DO UPDATE ... WHERE
+UPSERT_VENDORS = {'postgresql', 'sqlite'}
+SUBTOTAL_FIELD = DecimalField(max_digits=12, decimal_places=2)
+# Cart columns moved by _adjust_summary, reloaded before a changed cart is returned
+SUMMARY_FIELDS = ['item_count', 'subtotal', 'updated_at']
+
 
 class CartService:
     @staticmethod
     def get_or_create_cart(user):
         return selectors.get_user_cart(user)
 
+    @staticmethod
+    def lock_cart(user):
+        """
+        Get or create the user's cart and lock its row until the transaction ends.
+
+        Every change to a cart's items takes this lock first, so concurrent
+        changes to one cart serialize on it instead of racing on its lines.
+        Args:
+            user: Owner of the cart
+        Returns:
+            Cart instance
+        """
+        cart, created = Cart.objects.select_for_update().get_or_create(user=user)
+        return cart
+
     @staticmethod
     @transaction.atomic
     def add_product(user, product_id, quantity):
+        if cart_cache_enabled():
+            return CachedCartService.add_product(user, product_id, quantity)
         if quantity <= 0:
             raise ValidationError("Quantity must be greater than 0")
-
         try:
-            product = Product.objects.get(id=product_id)
-        except Product.DoesNotExist:
+            product_id = int(product_id)
+        except (TypeError, ValueError):
             raise ValidationError("Product not found")
 
-        if not product.is_active:
-            raise ValidationError("Product is not available")
-
-        if product.stock_quantity < quantity:
-            raise ValidationError(f"Not enough stock. Available: {product.stock_quantity}")
-
-        cart = CartService.get_or_create_cart(user)
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': quantity, 'price_snapshot': product.price}
-        )
-
-        if not created:
-            new_quantity = cart_item.quantity + quantity
-            if product.stock_quantity < new_quantity:
-                raise ValidationError(
-                    f"Not enough stock. Available: {product.stock_quantity}, Current in cart: {cart_item.quantity}")
-            cart_item.quantity = new_quantity
-            cart_item.save()
+        cart = CartService.lock_cart(user)
+        if connections[CartItem.objects.db].vendor in UPSERT_VENDORS:
+            added = _upsert_cart_item(cart.id, product_id, quantity)
+        else:
+            added = _add_cart_item(cart, product_id, quantity)
+        if not added:
+            raise _add_product_error(cart, product_id)
+        price_snapshot = CartItem.objects.filter(cart=cart, product_id=product_id).values('price_snapshot')
+        _adjust_summary(cart.id, quantity, Subquery(price_snapshot) * quantity)
+        cart.refresh_from_db(fields=SUMMARY_FIELDS)
         return cart
 
     @staticmethod
     @transaction.atomic
     def update_item_quantity(user, item_id, quantity):
+        if cart_cache_enabled():
+            return CachedCartService.update_item_quantity(user, item_id, quantity)
         if quantity < 0:
             raise ValidationError("Quantity cannot be negative")
 
-        cart = CartService.get_or_create_cart(user)
+        cart = CartService.lock_cart(user)
 
         try:
-            cart_item = CartItem.objects.select_related('product').get(cart=cart, id=item_id)
+            # The line stays locked until commit, so the summary moves by the quantity actually replaced
+            cart_item = CartItem.objects.select_for_update(of=('self',)).select_related('product').get(
+                cart=cart, id=item_id
+            )
         except CartItem.DoesNotExist:
             return None
 
         if quantity == 0:
             cart_item.delete()
+            _adjust_summary(cart.id, -cart_item.quantity, -cart_item.quantity * cart_item.price_snapshot)
             return None
 
         if cart_item.product.stock_quantity < quantity:
             raise ValidationError(f"Not enough stock. Available: {cart_item.product.stock_quantity}")
 
+        change = quantity - cart_item.quantity
         cart_item.quantity = quantity
-        cart_item.save()
+        cart_item.save(update_fields=['quantity'])
+        _adjust_summary(cart.id, change, change * cart_item.price_snapshot)
         return cart_item
 
     @staticmethod
+    @transaction.atomic
     def remove_item(user, item_id):
-        cart = CartService.get_or_create_cart(user)
+        if cart_cache_enabled():
+            return CachedCartService.remove_item(user, item_id)
+        cart = CartService.lock_cart(user)
         try:
-            cart_item = CartItem.objects.get(cart=cart, id=item_id)
-            cart_item.delete()
-            return True
+            cart_item = CartItem.objects.select_for_update().get(cart=cart, id=item_id)
         except CartItem.DoesNotExist:
             return False
+        cart_item.delete()
+        _adjust_summary(cart.id, -cart_item.quantity, -cart_item.quantity * cart_item.price_snapshot)
+        return True
 
     @staticmethod
+    @transaction.atomic
     def clear_cart(user):
-        cart = CartService.get_or_create_cart(user)
+        if cart_cache_enabled():
+            return CachedCartService.clear_cart(user)
+        cart = CartService.lock_cart(user)
         CartItem.objects.filter(cart=cart).delete()
+        Cart.objects.filter(id=cart.id).update(item_count=0, subtotal=0, updated_at=timezone.now())
 
     @staticmethod
     def calculate_cart_total(cart):
-        items = CartItem.objects.filter(cart=cart)
-        total = sum(item.quantity * item.price_snapshot for item in items)
-        return total
+        return Cart.objects.filter(id=cart.id).values_list('subtotal', flat=True).first() or 0
+
+    @staticmethod
+    def get_summary(user) -> dict:
+        """
+        Get the item count and subtotal of the user's cart without reading its items
+        Args:
+            user: Owner of the cart
+        Returns:
+            Dict with item_count and subtotal, zero for users without a cart
+        """
+        if cart_cache_enabled():
+            return CachedCartService.get_summary(user)
+        summary = Cart.objects.filter(user=user).order_by('id').values('item_count', 'subtotal').first()
+        return summary or {'item_count': 0, 'subtotal': Decimal('0')}
+
+    @staticmethod
+    def refresh_summaries(*cart_ids: int) -> None:
+        """
+        Recompute the stored totals of carts from their items in a single UPDATE
+        Args:
+            cart_ids: IDs of the carts to refresh, all carts if omitted
+        """
+        totals = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart').annotate(
+            count=Sum('quantity'),
+            amount=Sum(F('quantity') * F('price_snapshot'), output_field=SUBTOTAL_FIELD),
+        )
+        carts = Cart.objects.all()
+        if cart_ids:
+            carts = carts.filter(id__in=cart_ids)
+        carts.update(
+            item_count=Coalesce(Subquery(totals.values('count')), 0),
+            subtotal=Coalesce(Subquery(totals.values('amount')), 0, output_field=SUBTOTAL_FIELD),
+        )
+
+    @staticmethod
+    def purge_abandoned_carts(ttl_days: int = None, empty_ttl_days: int = None, chunk_size: int = None) -> dict:
+        """
+        Delete carts nobody touched for a while, with their items; safe to schedule
+        Args:
+            ttl_days: Idle days after which any cart is deleted, CART_TTL_DAYS if omitted
+            empty_ttl_days: Idle days after which a cart without items is deleted, CART_EMPTY_TTL_DAYS if omitted
+            chunk_size: Carts deleted per transaction, CART_PURGE_CHUNK_SIZE if omitted
+        Returns:
+            Dict with the number of carts and cart items deleted
+        Raises:
+            ValidationError if a TTL does not exceed CART_CACHE_TIMEOUT, as cached carts could be purged then
+        """
+        ttl_days = settings.CART_TTL_DAYS if ttl_days is None else ttl_days
+        empty_ttl_days = settings.CART_EMPTY_TTL_DAYS if empty_ttl_days is None else empty_ttl_days
+        if min(ttl_days, empty_ttl_days) * 24 * 60 * 60 <= settings.CART_CACHE_TIMEOUT:
+            raise ValidationError(
+                f"Cart TTLs must exceed CART_CACHE_TIMEOUT ({settings.CART_CACHE_TIMEOUT} seconds)")
+        chunk_size = chunk_size or settings.CART_PURGE_CHUNK_SIZE
+        now = timezone.now()
+        abandoned = Cart.objects.filter(
+            Q(updated_at__lt=now - timedelta(days=ttl_days))
+            | Q(updated_at__lt=now - timedelta(days=empty_ttl_days), item_count=0)
+        )
+
+        purged = {'carts': 0, 'items': 0}
+        while True:
+            # Short transactions keep locks and WAL bounded; carts locked by a concurrent change are left for later
+            with transaction.atomic():
+                candidates = abandoned.order_by('updated_at').select_for_update(skip_locked=True)
+                cart_ids = list(candidates.values_list('id', flat=True)[:chunk_size])
+                if cart_ids:
+                    _, deleted = Cart.objects.filter(id__in=cart_ids).delete()
+                    purged['carts'] += deleted.get(Cart._meta.label, 0)
+                    purged['items'] += deleted.get(CartItem._meta.label, 0)
+            if len(cart_ids) < chunk_size:
+                return purged
+
+    @staticmethod
+    @transaction.atomic
+    def apply_batch(user, operations):
+        """
+        Apply a list of cart operations in one transaction
+        Args:
+            user: Owner of the cart
+            operations: List of dicts with op ('add', 'set' or 'remove'), product_id and quantity, applied in order
+        Returns:
+            Cart instance
+        Raises:
+            ValidationError listing every line that cannot be applied, nothing is changed then
+        """
+        if cart_cache_enabled():
+            return CachedCartService.apply_batch(user, operations)
+
+        cart = CartService.lock_cart(user)
+        items = {item.product_id: item for item in CartItem.objects.select_for_update().filter(cart=cart)}
+        quantities = {product_id: item.quantity for product_id, item in items.items()}
+        final = resolve_batch(quantities, operations)
+        products = Product.objects.only('name', 'price', 'stock_quantity', 'is_active').in_bulk(
+            [product_id for product_id, quantity in final.items() if quantity]
+        )
+        validate_batch(final, quantities, products)
+
+        removed, changed, created = [], [], []
+        count_change, subtotal_change = 0, Decimal('0')
+        for product_id, quantity in final.items():
+            if product_id in items:
+                count_change += quantity - items[product_id].quantity
+                subtotal_change += (quantity - items[product_id].quantity) * items[product_id].price_snapshot
+            elif quantity:
+                count_change += quantity
+                subtotal_change += quantity * products[product_id].price
+
+            if not quantity:
+                if product_id in items:
+                    removed.append(items[product_id].id)
+            elif product_id in items:
+                if items[product_id].quantity != quantity:
+                    items[product_id].quantity = quantity
+                    changed.append(items[product_id])
+            else:
+                created.append(CartItem(
+                    cart=cart, product_id=product_id, quantity=quantity, price_snapshot=products[product_id].price,
+                ))
+
+        if removed:
+            CartItem.objects.filter(id__in=removed).delete()
+        if changed:
+            CartItem.objects.bulk_update(changed, ['quantity'])
+        if created:
+            CartItem.objects.bulk_create(created)
+        if removed or changed or created:
+            _adjust_summary(cart.id, count_change, subtotal_change)
+            cart.refresh_from_db(fields=SUMMARY_FIELDS)
+        return cart
+
+
+def _adjust_summary(cart_id, quantity, amount) -> None:
+    """Move the stored totals of a cart by a change to its items, in one UPDATE"""
+    Cart.objects.filter(id=cart_id).update(
+        item_count=F('item_count') + quantity,
+        subtotal=F('subtotal') + amount,
+        updated_at=timezone.now(),
+    )
+
+
+def _upsert_cart_item(cart_id, product_id, quantity) -> bool:
+    """
+    Add a quantity of a product to a cart line in one statement.
+
+    The line is inserted, or its quantity incremented when it already exists,
+    only if the product is active and has stock for the resulting quantity.
+    Concurrent adds of the same product serialize on the (cart, product)
+    unique index instead of losing updates.
+    Returns:
+        True if the line was added or incremented
+    """
+    connection = connections[CartItem.objects.db]
+    quote = connection.ops.quote_name
+    item_table, product_table = quote(CartItem._meta.db_table), quote(Product._meta.db_table)
+    sql = f"""
+        INSERT INTO {item_table} (cart_id, product_id, quantity, price_snapshot, created_at)
+        SELECT %s, product.id, %s, product.price, %s
+        FROM {product_table} AS product
+        WHERE product.id = %s AND product.is_active AND product.stock_quantity >= %s
+        ON CONFLICT (cart_id, product_id) DO UPDATE
+        SET quantity = {item_table}.quantity + excluded.quantity
+        WHERE {item_table}.quantity + excluded.quantity <= (
+            SELECT stock_quantity FROM {product_table} WHERE id = excluded.product_id
+        )
+    """
+    created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [cart_id, quantity, created_at, product_id, quantity])
+        return cursor.rowcount == 1
+
+
+def _add_cart_item(cart, product_id, quantity) -> bool:
+    """Portable _upsert_cart_item for backends without ON CONFLICT"""
+    product = Product.objects.filter(id=product_id, is_active=True).only('price', 'stock_quantity').first()
+    if product is None or product.stock_quantity < quantity:
+        return False
+
+    # The stock check is part of the UPDATE, so concurrent increments cannot overshoot it
+    increment = CartItem.objects.filter(
+        cart=cart, product=product, quantity__lte=product.stock_quantity - quantity
+    )
+    if increment.update(quantity=F('quantity') + quantity):
+        return True
+    if CartItem.objects.filter(cart=cart, product=product).exists():
+        return False
+    try:
+        with transaction.atomic():
+            CartItem.objects.create(cart=cart, product=product, quantity=quantity, price_snapshot=product.price)
+    except IntegrityError:
+        # A concurrent add created the line first
+        return bool(increment.update(quantity=F('quantity') + quantity))
+    return True
+
+
+def _add_product_error(cart, product_id) -> ValidationError:
+    """Explain why _upsert_cart_item or _add_cart_item added nothing"""
+    product = Product.objects.filter(id=product_id).values('is_active', 'stock_quantity').first()
+    if product is None:
+        return ValidationError("Product not found")
+    if not product['is_active']:
+        return ValidationError("Product is not available")
+    current = CartItem.objects.filter(cart=cart, product_id=product_id).values_list('quantity', flat=True).first()
+    if current:
+        return ValidationError(
+            f"Not enough stock. Available: {product['stock_quantity']}, Current in cart: {current}")
+    return ValidationError(f"Not enough stock. Available: {product['stock_quantity']}")
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import CartItem
+from .services import CartService
+from ..products.models import Product
+
+
+@receiver(pre_delete, sender=Product)
+def remember_carts_with_product(sender, instance, **kwargs):
+    """Deleting a product cascades to cart lines without going through CartService"""
+    instance._cart_ids = list(CartItem.objects.filter(product=instance).values_list('cart_id', flat=True))
+
+
+@receiver(post_delete, sender=Product)
+def refresh_carts_without_product(sender, instance, **kwargs):
+    cart_ids = getattr(instance, '_cart_ids', None)
+    if cart_ids:
+        CartService.refresh_summaries(*cart_ids)
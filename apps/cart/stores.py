@@ -0,0 +1,440 @@
+import time
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .batch import resolve_batch, validate_batch
+from .models import Cart, CartItem
+from ..orders.models import Order
+from ..products.models import Product
+
+CART_STATE_KEY = 'cart:state:{user_id}'
+CART_LOCK_KEY = 'cart:lock:{user_id}'
+# Write-behind log: every cart that turns dirty appends its user ID under the next sequence number
+DIRTY_SEQUENCE_KEY = 'cart:dirty:sequence'
+DIRTY_FLUSHED_KEY = 'cart:dirty:flushed'
+DIRTY_ENTRY_KEY = 'cart:dirty:{sequence}'
+DIRTY_GAP_KEY = 'cart:dirty:gap'
+DIRTY_FLUSH_LOCK_KEY = 'cart:dirty:lock'
+
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 5
+FLUSH_LOCK_TIMEOUT = 300
+
+
+def cart_cache_enabled() -> bool:
+    return settings.CART_BACKEND == 'cache'
+
+
+@contextmanager
+def cart_lock(user_id: int):
+    """
+    Serialize changes to one user's cached cart across processes
+    Args:
+        user_id: Owner of the cart
+    Raises:
+        ValidationError if the cart stays locked for longer than LOCK_WAIT seconds
+    """
+    key = CART_LOCK_KEY.format(user_id=user_id)
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(key, token, LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            raise ValidationError("Cart is busy, please try again")
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        # Past LOCK_TIMEOUT the lock may have expired and been taken by another worker
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+def get_state_summary(lines: dict) -> dict:
+    """
+    Totals of cached cart lines
+    Args:
+        lines: The `lines` of a cart state
+    Returns:
+        Dict with item_count and subtotal, like the columns on Cart
+    """
+    return {
+        'item_count': sum(line['quantity'] for line in lines.values()),
+        'subtotal': sum((line['quantity'] * line['price_snapshot'] for line in lines.values()), Decimal('0')),
+    }
+
+
+class CachedCartStore:
+    """
+    Live carts kept in the Django cache and written behind to Cart/CartItem.
+
+    A cart state is a dict with the database `cart_id` (None until the first
+    flush), `created_at`, `updated_at`, a `dirty` flag, a `version` counter
+    and `lines`, an insertion-ordered dict of product ID to quantity, price
+    snapshot and creation time. Line IDs exposed by the API are product IDs.
+
+    States are loaded from the database under a `SELECT ... FOR UPDATE` on
+    the cart row, so a load never observes a checkout that has not committed.
+    A loaded state is only cached if no other state was stored meanwhile.
+
+    A checkout records a `checkout` dict on the state with the lines it
+    ordered. Until the checkout is known to have committed or rolled back,
+    see `settle_checkout`, those lines stay in the cache.
+    """
+
+    @staticmethod
+    def get_state(user_id: int) -> dict:
+        """
+        Get a user's live cart, loading it from the database on a cache miss
+        Args:
+            user_id: Owner of the cart
+        Returns:
+            Cart state dict
+        """
+        key = CART_STATE_KEY.format(user_id=user_id)
+        state = cache.get(key)
+        if state is None:
+            state = CachedCartStore.load_state(user_id)
+            # A writer may have saved the cart since the load; its state wins over the snapshot
+            if not cache.add(key, state, settings.CART_CACHE_TIMEOUT):
+                state = cache.get(key, state)
+        return state
+
+    @staticmethod
+    def load_state(user_id: int) -> dict:
+        with transaction.atomic():
+            cart = Cart.objects.select_for_update().filter(user_id=user_id).order_by('id').first()
+            now = timezone.now()
+            state = {
+                'cart_id': None, 'created_at': now, 'updated_at': now, 'dirty': False, 'version': 0, 'lines': {},
+            }
+            if cart is None:
+                return state
+            state.update(cart_id=cart.id, created_at=cart.created_at, updated_at=cart.updated_at)
+            items = CartItem.objects.filter(cart=cart).order_by('id').values_list(
+                'product_id', 'quantity', 'price_snapshot', 'created_at'
+            )
+            for product_id, quantity, price_snapshot, created_at in items:
+                state['lines'][product_id] = {
+                    'quantity': quantity, 'price_snapshot': price_snapshot, 'created_at': created_at,
+                }
+        return state
+
+    @staticmethod
+    def save_state(user_id: int, state: dict) -> None:
+        """
+        Store a changed cart and queue it for the next flush. Callers hold cart_lock.
+        Args:
+            user_id: Owner of the cart
+            state: Modified cart state
+        """
+        state['updated_at'] = timezone.now()
+        state['version'] += 1
+        CachedCartStore.mark_dirty(user_id, state)
+        cache.set(CART_STATE_KEY.format(user_id=user_id), state, settings.CART_CACHE_TIMEOUT)
+
+    @staticmethod
+    def mark_dirty(user_id: int, state: dict) -> None:
+        """Flag a cart state as dirty and append it to the write-behind log unless it is queued already"""
+        if not state['dirty']:
+            state['dirty'] = True
+            cache.add(DIRTY_SEQUENCE_KEY, 0, None)
+            sequence = cache.incr(DIRTY_SEQUENCE_KEY)
+            cache.set(DIRTY_ENTRY_KEY.format(sequence=sequence), user_id, settings.CART_CACHE_TIMEOUT)
+
+    @staticmethod
+    def write_state(user_id: int, state: dict) -> Cart:
+        """
+        Make the Cart and CartItem rows match a cart state, in the caller's transaction
+        Args:
+            user_id: Owner of the cart
+            state: Cart state to persist
+        Returns:
+            The locked Cart row
+        """
+        with transaction.atomic():
+            cart = Cart.objects.select_for_update().filter(user_id=user_id).order_by('id').first()
+            if cart is None:
+                cart = Cart.objects.create(user_id=user_id)
+            # Products deleted since they were added have lost their cart lines in the database too
+            product_ids = set(Product.objects.filter(id__in=state['lines']).values_list('id', flat=True))
+            lines = {product_id: line for product_id, line in state['lines'].items() if product_id in product_ids}
+
+            CartItem.objects.filter(cart=cart).exclude(product_id__in=lines).delete()
+            CartItem.objects.bulk_create(
+                [
+                    CartItem(
+                        cart=cart, product_id=product_id, quantity=line['quantity'],
+                        price_snapshot=line['price_snapshot'], created_at=line['created_at'],
+                    )
+                    for product_id, line in lines.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['cart', 'product'],
+                update_fields=['quantity', 'price_snapshot'],
+            )
+            Cart.objects.filter(id=cart.id).update(updated_at=state['updated_at'], **get_state_summary(lines))
+        return cart
+
+    @staticmethod
+    def flush(user_id: int) -> bool:
+        """
+        Persist a user's dirty cart
+        Args:
+            user_id: Owner of the cart
+        Returns:
+            True if a dirty cart was written
+        """
+        with cart_lock(user_id):
+            state = cache.get(CART_STATE_KEY.format(user_id=user_id))
+            if state is None or not state['dirty']:
+                return False
+            with transaction.atomic():
+                if state.get('checkout') is not None:
+                    CachedCartStore.settle_checkout(state, CachedCartStore.checkout_committed(user_id, state))
+                cart = CachedCartStore.write_state(user_id, state)
+            state.update(cart_id=cart.id, dirty=False)
+            cache.set(CART_STATE_KEY.format(user_id=user_id), state, settings.CART_CACHE_TIMEOUT)
+        return True
+
+    @staticmethod
+    def flush_for_checkout(user_id: int) -> None:
+        """
+        Persist a user's live cart inside the checkout transaction.
+
+        The cart row stays locked until the checkout commits, which keeps
+        concurrent loads out until then. The cached state stays dirty and
+        records the checkout, so whoever handles it next drops the ordered
+        lines if the checkout committed and keeps them if it rolled back.
+        Args:
+            user_id: Owner of the cart
+        """
+        key = CART_STATE_KEY.format(user_id=user_id)
+        with cart_lock(user_id):
+            state = cache.get(key)
+            if state is None:
+                Cart.objects.select_for_update().filter(user_id=user_id).first()
+                return
+            CachedCartStore.write_state(user_id, state)
+            checkout = {
+                'token': uuid.uuid4().hex, 'started_at': timezone.now(), 'version': state['version'],
+                'lines': {product_id: dict(line) for product_id, line in state['lines'].items()},
+            }
+            # Queued, so a flush settles the checkout if the discard below never runs
+            state = {**state, 'checkout': checkout}
+            CachedCartStore.mark_dirty(user_id, state)
+            cache.set(key, state, settings.CART_CACHE_TIMEOUT)
+        # A discard that fails leaves the checkout recorded for the next flush to settle
+        transaction.on_commit(
+            lambda: CachedCartStore.discard_checked_out(user_id, checkout['token']), robust=True
+        )
+
+    @staticmethod
+    def checkout_committed(user_id: int, state: dict) -> bool:
+        """
+        Wait for the checkout recorded on a state to end and tell whether it committed
+        Args:
+            user_id: Owner of the cart
+            state: Cart state with a `checkout`
+        Returns:
+            True if the checkout created its order
+        """
+        with transaction.atomic():
+            # The checkout holds the cart row until it commits or rolls back
+            Cart.objects.select_for_update().filter(user_id=user_id).first()
+            return Order.objects.filter(user_id=user_id, created_at__gte=state['checkout']['started_at']).exists()
+
+    @staticmethod
+    def settle_checkout(state: dict, committed: bool) -> None:
+        """
+        Forget the checkout recorded on a state. Callers hold cart_lock.
+        Args:
+            state: Cart state with a `checkout`, changed in place
+            committed: Whether the checkout committed; its ordered lines are removed then
+        """
+        checkout = state.pop('checkout')
+        if not committed:
+            return
+        # Lines changed or added after the checkout wrote the cart are kept
+        for product_id, line in checkout['lines'].items():
+            if state['lines'].get(product_id) == line:
+                del state['lines'][product_id]
+
+    @staticmethod
+    def discard_checked_out(user_id: int, token: str) -> None:
+        """
+        Drop the cached cart after a checkout committed.
+
+        If the cart changed after the checkout wrote it, only the lines the
+        checkout ordered unchanged are removed, so the later changes survive.
+        Args:
+            user_id: Owner of the cart
+            token: Token of the committed checkout, nothing is done if a flush already settled it
+        """
+        key = CART_STATE_KEY.format(user_id=user_id)
+        with cart_lock(user_id):
+            state = cache.get(key)
+            if state is None or (state.get('checkout') or {}).get('token') != token:
+                return
+            if state['version'] == state['checkout']['version']:
+                cache.delete(key)
+                return
+            CachedCartStore.settle_checkout(state, committed=True)
+            CachedCartStore.save_state(user_id, state)
+
+    @staticmethod
+    def flush_dirty(limit: int = None) -> int:
+        """
+        Write behind every cart changed since the last run; safe to schedule, runs are serialized
+        Args:
+            limit: Maximum number of log entries to process, all if omitted
+        Returns:
+            Number of carts written
+        """
+        if not cache.add(DIRTY_FLUSH_LOCK_KEY, 1, FLUSH_LOCK_TIMEOUT):
+            return 0
+        try:
+            flushed = cache.get(DIRTY_FLUSHED_KEY, 0)
+            end = cache.get(DIRTY_SEQUENCE_KEY, 0)
+            if limit is not None:
+                end = min(end, flushed + limit)
+            written = 0
+            for sequence in range(flushed + 1, end + 1):
+                user_id = cache.get(DIRTY_ENTRY_KEY.format(sequence=sequence))
+                if user_id is None and not CachedCartStore.is_abandoned_entry(sequence):
+                    # save_state took the number but has not written the entry yet
+                    break
+                if user_id is not None and CachedCartStore.flush(user_id):
+                    written += 1
+                cache.delete(DIRTY_ENTRY_KEY.format(sequence=sequence))
+                cache.set(DIRTY_FLUSHED_KEY, sequence, None)
+            return written
+        finally:
+            cache.delete(DIRTY_FLUSH_LOCK_KEY)
+
+    @staticmethod
+    def is_abandoned_entry(sequence: int) -> bool:
+        """
+        Check whether a missing log entry will never be written
+        Args:
+            sequence: Sequence number of the missing entry
+        Returns:
+            True once the entry has been missing for longer than a cart lock can be held
+        """
+        now = time.time()
+        gap = cache.get(DIRTY_GAP_KEY)
+        if gap is None or gap[0] != sequence:
+            cache.set(DIRTY_GAP_KEY, (sequence, now), None)
+            return False
+        return now - gap[1] > LOCK_TIMEOUT
+
+
+class CachedCartService:
+    """CartService operations against the cached cart, see CachedCartStore"""
+
+    @staticmethod
+    def add_product(user, product_id, quantity) -> dict:
+        if quantity <= 0:
+            raise ValidationError("Quantity must be greater than 0")
+
+        try:
+            product = Product.objects.only('price', 'stock_quantity', 'is_active').get(id=product_id)
+        except Product.DoesNotExist:
+            raise ValidationError("Product not found")
+
+        if not product.is_active:
+            raise ValidationError("Product is not available")
+
+        with cart_lock(user.id):
+            state = CachedCartStore.get_state(user.id)
+            line = state['lines'].get(product.id)
+            current = line['quantity'] if line else 0
+            if product.stock_quantity < current + quantity:
+                if line:
+                    raise ValidationError(
+                        f"Not enough stock. Available: {product.stock_quantity}, Current in cart: {current}")
+                raise ValidationError(f"Not enough stock. Available: {product.stock_quantity}")
+            if line:
+                line['quantity'] += quantity
+            else:
+                state['lines'][product.id] = {
+                    'quantity': quantity, 'price_snapshot': product.price, 'created_at': timezone.now(),
+                }
+            CachedCartStore.save_state(user.id, state)
+        return state
+
+    @staticmethod
+    def update_item_quantity(user, item_id, quantity) -> dict:
+        """
+        Returns:
+            Dict of product_id and the updated line, or None if the line is gone
+        """
+        if quantity < 0:
+            raise ValidationError("Quantity cannot be negative")
+
+        with cart_lock(user.id):
+            state = CachedCartStore.get_state(user.id)
+            line = state['lines'].get(item_id)
+            if line is None:
+                return None
+            if quantity == 0:
+                del state['lines'][item_id]
+                CachedCartStore.save_state(user.id, state)
+                return None
+
+            stock_quantity = Product.objects.filter(id=item_id).values_list('stock_quantity', flat=True).first() or 0
+            if stock_quantity < quantity:
+                raise ValidationError(f"Not enough stock. Available: {stock_quantity}")
+            line['quantity'] = quantity
+            CachedCartStore.save_state(user.id, state)
+        return {'product_id': item_id, **line}
+
+    @staticmethod
+    def remove_item(user, item_id) -> bool:
+        with cart_lock(user.id):
+            state = CachedCartStore.get_state(user.id)
+            if state['lines'].pop(item_id, None) is None:
+                return False
+            CachedCartStore.save_state(user.id, state)
+        return True
+
+    @staticmethod
+    def get_summary(user) -> dict:
+        return get_state_summary(CachedCartStore.get_state(user.id)['lines'])
+
+    @staticmethod
+    def clear_cart(user) -> None:
+        with cart_lock(user.id):
+            state = CachedCartStore.get_state(user.id)
+            state['lines'].clear()
+            CachedCartStore.save_state(user.id, state)
+
+    @staticmethod
+    def apply_batch(user, operations) -> dict:
+        with cart_lock(user.id):
+            state = CachedCartStore.get_state(user.id)
+            quantities = {product_id: line['quantity'] for product_id, line in state['lines'].items()}
+            final = resolve_batch(quantities, operations)
+            products = Product.objects.only('name', 'price', 'stock_quantity', 'is_active').in_bulk(
+                [product_id for product_id, quantity in final.items() if quantity]
+            )
+            validate_batch(final, quantities, products)
+
+            now = timezone.now()
+            for product_id, quantity in final.items():
+                if not quantity:
+                    state['lines'].pop(product_id, None)
+                elif product_id in state['lines']:
+                    state['lines'][product_id]['quantity'] = quantity
+                else:
+                    state['lines'][product_id] = {
+                        'quantity': quantity, 'price_snapshot': products[product_id].price, 'created_at': now,
+                    }
+            CachedCartStore.save_state(user.id, state)
+        return state
@@ -1,3 +1,532 @@
-from django.test import TestCase
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIClient
+
+from .api.serializers import CartSerializer
+from .models import Cart, CartItem
+from .services import CartService
+from .stores import (
+    CART_LOCK_KEY,
+    CART_STATE_KEY,
+    DIRTY_FLUSHED_KEY,
+    DIRTY_SEQUENCE_KEY,
+    LOCK_TIMEOUT,
+    CachedCartStore,
+    cart_lock,
+)
+from ..accounts.models import CustomUser
+from ..orders.services import OrderService
+from ..products.models import Category, Product
+
+
+class CartReadTest(APITestCase):
+    """Test the side-effect-free cart read path"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', password='BuyerPassword123!')
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.products = [
+            Product.objects.create(
+                name=f'Phone {index}', slug=f'phone-{index}', description='', price=Decimal('10.50') + index,
+                stock_quantity=10, category=category,
+            )
+            for index in range(3)
+        ]
+
+    def test_missing_cart_is_empty_and_not_created(self):
+        """Test reading a missing cart returns an empty cart without inserting a row"""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('cart'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['items'], [])
+        self.assertEqual((response.data['total_items'], response.data['cart_total']), (0, 0))
+        self.assertEqual(response.data['user'], self.user.id)
+        self.assertFalse(Cart.objects.exists())
+
+        response = self.client.get(reverse('cart'), {'fields': 'total_items'})
+        self.assertEqual(response.data, {'total_items': 0})
+
+    def test_cart_read_is_two_queries(self):
+        """Test the cart, its totals, items and products cost two queries and match CartSerializer"""
+        cart = Cart.objects.create(user=self.user)
+        for index, product in enumerate(self.products):
+            CartItem.objects.create(cart=cart, product=product, quantity=index + 1, price_snapshot=product.price)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('cart'))
+        self.assertEqual(response.data['total_items'], 6)
+        self.assertEqual(response.data['cart_total'], Decimal('10.50') + Decimal('11.50') * 2 + Decimal('12.50') * 3)
+
+        cart = Cart.objects.prefetch_related('items__product').get(id=cart.id)
+        self.assertEqual(JSONRenderer().render(response.data), JSONRenderer().render(CartSerializer(cart).data))
+
+    def test_empty_existing_cart(self):
+        """Test an existing cart without items has zero totals"""
+        Cart.objects.create(user=self.user)
+        response = self.client.get(reverse('cart'))
+        self.assertEqual((response.data['total_items'], response.data['cart_total']), (0, 0))
+        self.assertEqual(JSONRenderer().render(response.data['cart_total']), b'0')
+
+
+class CartBatchTest(APITestCase):
+    """Test applying several cart operations in one request"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', password='BuyerPassword123!')
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.products = [
+            Product.objects.create(
+                name=f'Phone {index}', slug=f'phone-{index}', description='', price=Decimal('10.50') + index,
+                stock_quantity=5, category=category,
+            )
+            for index in range(4)
+        ]
+        for product in self.products[:2]:
+            self.cart = CartService.add_product(self.user, product.id, 2)
+
+    def batch(self, *operations):
+        return self.client.post(reverse('cart-batch'), {'operations': list(operations)}, format='json')
+
+    def quantities(self):
+        return dict(CartItem.objects.filter(cart=self.cart).values_list('product_id', 'quantity'))
+
+    def test_operations_apply_in_order(self):
+        """Test add, set and remove on new and existing lines apply in order"""
+        first, second, third, fourth = (product.id for product in self.products)
+        response = self.batch(
+            {'op': 'add', 'product_id': first, 'quantity': 1},
+            {'op': 'set', 'product_id': first, 'quantity': 4},
+            {'op': 'remove', 'product_id': second},
+            {'op': 'add', 'product_id': third, 'quantity': 2},
+            {'op': 'add', 'product_id': third, 'quantity': 1},
+            {'op': 'set', 'product_id': fourth, 'quantity': 1},
+            {'op': 'remove', 'product_id': fourth},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.quantities(), {first: 4, third: 3})
+        self.assertEqual(response.data['total_items'], 7)
+        self.assertEqual(CartItem.objects.get(product_id=third).price_snapshot, self.products[2].price)
+
+    def test_failure_changes_nothing(self):
+        """Test one line over stock rejects the whole batch and lists every failing line"""
+        self.products[3].is_active = False
+        self.products[3].save()
+        response = self.batch(
+            {'op': 'remove', 'product_id': self.products[0].id},
+            {'op': 'add', 'product_id': self.products[1].id, 'quantity': 4},
+            {'op': 'add', 'product_id': self.products[3].id, 'quantity': 1},
+            {'op': 'add', 'product_id': 0, 'quantity': 1},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data['errors']), 3)
+        self.assertEqual(self.quantities(), {self.products[0].id: 2, self.products[1].id: 2})
+
+    def test_invalid_operations(self):
+        """Test malformed operations are rejected before touching the cart"""
+        for operations in ([], [{'op': 'add', 'product_id': self.products[2].id}],
+                           [{'op': 'add', 'product_id': self.products[2].id, 'quantity': 0}],
+                           [{'op': 'move', 'product_id': self.products[2].id, 'quantity': 1}]):
+            response = self.batch(*operations)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, operations)
+
+    def test_query_count_does_not_grow_with_operations(self):
+        """Test a batch costs the same number of queries whatever its size"""
+        operations = [{'op': 'set', 'product_id': product.id, 'quantity': 1} for product in self.products]
+        operations.append({'op': 'remove', 'product_id': self.products[0].id})
+        # Savepoint, cart, items, products, delete, update, insert, summary, reload, release, items of the response
+        with self.assertNumQueries(11):
+            response = self.batch(*operations)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.quantities(), {product.id: 1 for product in self.products[1:]})
+
+    @override_settings(CART_BACKEND='cache')
+    def test_cached_cart(self):
+        """Test batches apply to the cached cart and rollback on failure"""
+        cache.clear()
+        response = self.batch(
+            {'op': 'set', 'product_id': self.products[0].id, 'quantity': 5},
+            {'op': 'add', 'product_id': self.products[2].id, 'quantity': 1},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item['id'], item['quantity']) for item in response.data['items']],
+            [(self.products[0].id, 5), (self.products[1].id, 2), (self.products[2].id, 1)],
+        )
+        response = self.batch({'op': 'add', 'product_id': self.products[0].id, 'quantity': 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse('cart')).data['total_items'], 8)
+
+
+class AddToCartTest(APITestCase):
+    """Test adding products goes through the single-statement upsert"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', password='BuyerPassword123!')
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.product = Product.objects.create(
+            name='Phone', slug='phone', description='', price=Decimal('10.50'), stock_quantity=5, category=category,
+        )
+
+    def test_add_increments_existing_line(self):
+        """Test repeated adds increment one line and keep the first price snapshot"""
+        CartService.add_product(self.user, self.product.id, 2)
+        Product.objects.filter(id=self.product.id).update(price=Decimal('12.00'))
+        # Savepoint, cart, upsert, summary, reload, release
+        with self.assertNumQueries(6):
+            cart = CartService.add_product(self.user, str(self.product.id), 3)
+        item = CartItem.objects.get(cart=cart)
+        self.assertEqual((item.quantity, item.price_snapshot), (5, Decimal('10.50')))
+        stored = Cart.objects.get(id=cart.id)
+        self.assertEqual((cart.updated_at, cart.item_count), (stored.updated_at, 5))
+
+    def test_add_is_rejected_without_change(self):
+        """Test adds of missing, inactive or out-of-stock products explain why and change nothing"""
+        CartService.add_product(self.user, self.product.id, 4)
+        with self.assertRaisesMessage(ValidationError, 'Available: 5, Current in cart: 4'):
+            CartService.add_product(self.user, self.product.id, 2)
+        with self.assertRaisesMessage(ValidationError, 'Product not found'):
+            CartService.add_product(self.user, 0, 1)
+        Product.objects.filter(id=self.product.id).update(is_active=False)
+        with self.assertRaisesMessage(ValidationError, 'Product is not available'):
+            CartService.add_product(self.user, self.product.id, 1)
+        self.assertEqual(CartItem.objects.get().quantity, 4)
+
+    def test_portable_fallback(self):
+        """Test the fallback used by backends without ON CONFLICT behaves like the upsert"""
+        with patch('apps.cart.services.UPSERT_VENDORS', set()):
+            CartService.add_product(self.user, self.product.id, 2)
+            CartService.add_product(self.user, self.product.id, 3)
+            with self.assertRaisesMessage(ValidationError, 'Current in cart: 5'):
+                CartService.add_product(self.user, self.product.id, 1)
+        self.assertEqual(CartItem.objects.get().quantity, 5)
+
+
+@skipUnless(connection.vendor == 'postgresql', "SQLite fails concurrent writers instead of queueing them")
+class ConcurrentAddToCartTest(TransactionTestCase):
+    """Test parallel adds of the same product neither lose updates nor overshoot the stock"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', password='BuyerPassword123!')
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.product = Product.objects.create(
+            name='Phone', slug='phone', description='', price=Decimal('10.50'), stock_quantity=6, category=category,
+        )
+        Cart.objects.create(user=self.user)
+
+    def add_in_parallel(self, count):
+        barrier = threading.Barrier(count)
+
+        def add():
+            try:
+                barrier.wait()
+                CartService.add_product(self.user, self.product.id, 1)
+                return True
+            except ValidationError:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            return list(executor.map(lambda _: add(), range(count)))
+
+    def test_parallel_adds(self):
+        """Test eight parallel single adds against a stock of six leave exactly six in the cart"""
+        results = self.add_in_parallel(8)
+        self.assertEqual(results.count(True), 6)
+        self.assertEqual(CartItem.objects.get().quantity, 6)
+
+    def test_parallel_batches_and_adds(self):
+        """Test batches and single adds inserting the same new line serialize instead of failing"""
+        barrier = threading.Barrier(4)
+
+        def change(batch):
+            try:
+                barrier.wait()
+                if batch:
+                    CartService.apply_batch(self.user, [{'op': 'add', 'product_id': self.product.id, 'quantity': 1}])
+                else:
+                    CartService.add_product(self.user, self.product.id, 1)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(change, [True, True, False, False]))
+        self.assertEqual(CartItem.objects.get().quantity, 4)
+        self.assertEqual(Cart.objects.get().item_count, 4)
+
+
+class CartSummaryTest(APITestCase):
+    """Test the stored cart totals and the summary endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', password='BuyerPassword123!')
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.products = [
+            Product.objects.create(
+                name=f'Phone {index}', slug=f'phone-{index}', description='', price=Decimal('10.50') + index,
+                stock_quantity=10, category=category,
+            )
+            for index in range(3)
+        ]
+
+    def assertSummaryMatchesItems(self):
+        cart = Cart.objects.get(user=self.user)
+        items = list(CartItem.objects.filter(cart=cart))
+        self.assertEqual(cart.item_count, sum(item.quantity for item in items))
+        self.assertEqual(cart.subtotal, sum((item.quantity * item.price_snapshot for item in items), Decimal('0')))
+
+    def test_every_mutation_keeps_summary(self):
+        """Test adds, updates, removals, batches, product deletion and clearing keep the totals exact"""
+        first, second, third = self.products
+        CartService.add_product(self.user, first.id, 2)
+        CartService.add_product(self.user, first.id, 1)
+        cart = CartService.add_product(self.user, second.id, 4)
+        self.assertSummaryMatchesItems()
+
+        item = CartItem.objects.get(cart=cart, product=second)
+        CartService.update_item_quantity(self.user, item.id, 1)
+        self.assertSummaryMatchesItems()
+        CartService.update_item_quantity(self.user, item.id, 0)
+        self.assertSummaryMatchesItems()
+
+        CartService.apply_batch(self.user, [
+            {'op': 'add', 'product_id': second.id, 'quantity': 2},
+            {'op': 'set', 'product_id': first.id, 'quantity': 1},
+            {'op': 'add', 'product_id': third.id, 'quantity': 3},
+        ])
+        self.assertSummaryMatchesItems()
+        CartService.remove_item(self.user, CartItem.objects.get(cart=cart, product=first).id)
+        self.assertSummaryMatchesItems()
+
+        third.delete()
+        self.assertSummaryMatchesItems()
+        self.assertEqual(Cart.objects.get(id=cart.id).item_count, 2)
+
+        CartService.clear_cart(self.user)
+        self.assertEqual(CartService.get_summary(self.user), {'item_count': 0, 'subtotal': Decimal('0')})
+
+    def test_summary_reads_one_row(self):
+        """Test the summary endpoint costs one query without joins, also for users without a cart"""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('cart-summary'))
+        self.assertEqual(response.data, {'item_count': 0, 'subtotal': '0.00'})
+
+        CartService.add_product(self.user, self.products[0].id, 2)
+        CartService.add_product(self.user, self.products[1].id, 1)
+        with self.assertNumQueries(1) as context:
+            response = self.client.get(reverse('cart-summary'))
+        self.assertNotIn('JOIN', context.captured_queries[0]['sql'])
+        self.assertEqual(response.data, {'item_count': 3, 'subtotal': '32.50'})
+
+    def test_checkout_resets_summary(self):
+        """Test placing an order empties the stored totals with the cart"""
+        CartService.add_product(self.user, self.products[0].id, 2)
+        OrderService.create_order_from_cart(self.user.id, 'Street 1')
+        self.assertEqual(CartService.get_summary(self.user), {'item_count': 0, 'subtotal': Decimal('0')})
+
+    @override_settings(CART_BACKEND='cache')
+    def test_cached_cart_summary(self):
+        """Test cache mode serves the summary from the live cart and writes the totals behind"""
+        cache.clear()
+        CartService.add_product(self.user, self.products[0].id, 2)
+        CartService.add_product(self.user, self.products[2].id, 1)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('cart-summary'))
+        self.assertEqual(response.data, {'item_count': 3, 'subtotal': '33.50'})
+
+        CachedCartStore.flush_dirty()
+        self.assertSummaryMatchesItems()
+
+
+class PurgeCartsTest(APITestCase):
+    """Test the chunked purge of abandoned and empty carts"""
+
+    def setUp(self):
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.product = Product.objects.create(
+            name='Phone', slug='phone', description='', price=Decimal('10.50'), stock_quantity=10, category=category,
+        )
+        self.users = [
+            CustomUser.objects.create_user(email=f'buyer{index}@example.com', password='BuyerPassword123!')
+            for index in range(5)
+        ]
+
+    def cart(self, user, idle_days, quantity=0):
+        cart = Cart.objects.create(user=user)
+        if quantity:
+            cart = CartService.add_product(user, self.product.id, quantity)
+        Cart.objects.filter(id=cart.id).update(updated_at=timezone.now() - timedelta(days=idle_days))
+        return cart
+
+    def test_purges_idle_carts_in_chunks(self):
+        """Test idle carts and old empty carts go, active carts stay, and removed rows are reported"""
+        abandoned = [self.cart(user, 40, quantity=2) for user in self.users[:3]]
+        empty = self.cart(self.users[3], 10)
+        active = self.cart(self.users[4], 10, quantity=1)
+
+        stdout = StringIO()
+        with override_settings(CART_TTL_DAYS=30, CART_EMPTY_TTL_DAYS=8, CART_PURGE_CHUNK_SIZE=2):
+            call_command('purge_carts', stdout=stdout)
+        self.assertIn('Purged 4 carts and 3 cart items', stdout.getvalue())
+        self.assertEqual(list(Cart.objects.values_list('id', flat=True)), [active.id])
+        self.assertFalse(Cart.objects.filter(id__in=[cart.id for cart in abandoned + [empty]]).exists())
+        self.assertEqual(CartService.purge_abandoned_carts(chunk_size=2), {'carts': 0, 'items': 0})
+
+    def test_cart_changes_reset_idle_time(self):
+        """Test changing an old cart keeps it from being purged"""
+        self.cart(self.users[0], 40, quantity=1)
+        CartService.add_product(self.users[0], self.product.id, 1)
+        self.assertEqual(CartService.purge_abandoned_carts(ttl_days=30), {'carts': 0, 'items': 0})
+
+    def test_ttls_must_exceed_cache_timeout(self):
+        """Test purging refuses TTLs that could delete carts still live in the cache"""
+        self.cart(self.users[0], 10)
+        with self.assertRaises(CommandError):
+            call_command('purge_carts', empty_ttl_days=7, stdout=StringIO())
+        self.assertTrue(Cart.objects.exists())
+
+
+@override_settings(CART_BACKEND='cache')
+class CachedCartTest(APITestCase):
+    """Test the cache-backed cart store with write-behind persistence"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', password='BuyerPassword123!')
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.products = [
+            Product.objects.create(
+                name=f'Phone {index}', slug=f'phone-{index}', description='', price=Decimal('10.50') + index,
+                stock_quantity=5, category=category,
+            )
+            for index in range(2)
+        ]
+
+    def add(self, product, quantity=1):
+        return self.client.post(reverse('add-cart-item'), {'product_id': product.id, 'quantity': quantity})
+
+    def test_mutations_stay_in_cache_until_flushed(self):
+        """Test cart changes are served from the cache and written behind by flush_carts"""
+        self.add(self.products[0], 2)
+        response = self.add(self.products[1])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_items'], 3)
+        self.assertFalse(CartItem.objects.exists())
+
+        response = self.client.put(
+            reverse('update-remove-cart-item', kwargs={'item_id': self.products[0].id}), {'quantity': 4}
+        )
+        self.assertEqual((response.data['id'], response.data['quantity']), (self.products[0].id, 4))
+        self.client.delete(reverse('update-remove-cart-item', kwargs={'item_id': self.products[1].id}))
+        response = self.client.get(reverse('cart'))
+        self.assertEqual([item['quantity'] for item in response.data['items']], [4])
+
+        stdout = StringIO()
+        call_command('flush_carts', stdout=stdout)
+        self.assertIn('Flushed 1 carts', stdout.getvalue())
+        self.assertEqual(
+            list(CartItem.objects.values_list('product_id', 'quantity')), [(self.products[0].id, 4)]
+        )
+        self.assertEqual(CachedCartStore.flush_dirty(), 0)
+
+    def test_stock_is_checked(self):
+        """Test adds beyond the available stock are rejected"""
+        self.add(self.products[0], 4)
+        response = self.add(self.products[0], 2)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_checkout_sees_live_cart(self):
+        """Test checkout orders the cached lines and empties the cart"""
+        self.add(self.products[0], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            order = OrderService.create_order_from_cart(self.user.id, 'Street 1')
+        self.assertEqual(list(order.items.values_list('product_id', 'quantity')), [(self.products[0].id, 2)])
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(self.client.get(reverse('cart')).data['items'], [])
+
+    def test_failed_checkout_keeps_cart(self):
+        """Test a checkout that rolls back leaves the cached cart queued for flushing"""
+        self.add(self.products[0], 2)
+        Product.objects.filter(id=self.products[0].id).update(stock_quantity=1)
+        with self.assertRaises(ValidationError), self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                OrderService.create_order_from_cart(self.user.id, 'Street 1')
+        self.assertEqual(self.client.get(reverse('cart')).data['total_items'], 2)
+        self.assertEqual(CachedCartStore.flush_dirty(), 1)
+        self.assertEqual(list(CartItem.objects.values_list('product_id', 'quantity')), [(self.products[0].id, 2)])
+
+    def test_flush_before_discard_keeps_order_out_of_cart(self):
+        """Test a flush between the checkout commit and the cache discard does not restore ordered lines"""
+        self.add(self.products[0], 2)
+        with self.captureOnCommitCallbacks() as callbacks:
+            order = OrderService.create_order_from_cart(self.user.id, 'Street 1')
+        self.assertTrue(CachedCartStore.flush(self.user.id))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(list(order.items.values_list('product_id', 'quantity')), [(self.products[0].id, 2)])
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(self.client.get(reverse('cart')).data['items'], [])
+        self.assertEqual(CachedCartStore.flush_dirty(), 0)
+
+    def test_flush_waits_for_unwritten_log_entry(self):
+        """Test the write-behind log stops at a sequence number whose entry is not written yet"""
+        self.add(self.products[0])
+        cache.incr(DIRTY_SEQUENCE_KEY)
+        self.assertEqual(CachedCartStore.flush_dirty(), 1)
+        self.assertEqual(cache.get(DIRTY_FLUSHED_KEY), 1)
+        with patch('apps.cart.stores.time.time', return_value=time.time() + LOCK_TIMEOUT + 1):
+            self.assertEqual(CachedCartStore.flush_dirty(), 0)
+        self.assertEqual(cache.get(DIRTY_FLUSHED_KEY), 2)
+
+    def test_expired_lock_is_not_released(self):
+        """Test leaving cart_lock keeps a lock another worker took after this one expired"""
+        key = CART_LOCK_KEY.format(user_id=self.user.id)
+        with cart_lock(self.user.id):
+            cache.set(key, 'other')
+        self.assertEqual(cache.get(key), 'other')
+
+    def test_change_during_checkout_survives(self):
+        """Test a line added while the checkout commits stays in the cart"""
+        self.add(self.products[0], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                OrderService.create_order_from_cart(self.user.id, 'Street 1')
+                self.add(self.products[1])
+        response = self.client.get(reverse('cart'))
+        self.assertEqual([item['id'] for item in response.data['items']], [self.products[1].id])
+
+    def test_load_does_not_replace_saved_state(self):
+        """Test a cache miss keeps a state another writer stored during the load"""
+        load_state = CachedCartStore.load_state
+
+        def load_during_write(user_id):
+            state = load_state(user_id)
+            cache.set(CART_STATE_KEY.format(user_id=user_id), {**state, 'version': 5})
+            return state
+
+        with patch.object(CachedCartStore, 'load_state', side_effect=load_during_write):
+            self.assertEqual(CachedCartStore.get_state(self.user.id)['version'], 5)
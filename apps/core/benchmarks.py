@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+from apps.accounts.models import CustomUser
+from apps.cart.models import Cart, CartItem
+from apps.orders.models import Order, OrderItem
+from apps.products.models import Category, Product, ProductImage
+
+
+class Rollback(Exception):
+    """Raised inside a benchmark transaction to discard the seeded rows"""
+
+
+def seed_benchmark_data(size):
+    """
+    Create `size` products, a cart with `size` items and `size` orders of two items for a new user
+    Args:
+        size: Number of products, cart items and orders
+    Returns:
+        Tuple of (user, list of product ids)
+    """
+    user = CustomUser.objects.create_user(email=f'benchmark-{size}@example.com', password='BenchmarkPassword1!')
+    category = Category.objects.create(name=f'Benchmark {size}', slug=f'benchmark-{size}')
+    products = Product.objects.bulk_create([
+        Product(
+            name=f'Benchmark product {index}', slug=f'benchmark-{size}-{index}', description='Seeded',
+            price=Decimal(index % 500) + Decimal('0.99'), stock_quantity=index, category=category,
+        )
+        for index in range(size)
+    ])
+    ProductImage.objects.bulk_create([
+        ProductImage(product=product, image_url=f'https://example.com/{product.slug}-{image}.png', is_primary=image == 0)
+        for product in products for image in range(2)
+    ])
+
+    cart = Cart.objects.create(user=user)
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, product=product, quantity=index % 3 + 1, price_snapshot=product.price)
+        for index, product in enumerate(products)
+    ])
+    orders = Order.objects.bulk_create([
+        Order(user=user, total_amount=Decimal('0.00'), shipping_address='Benchmark street') for _ in range(size)
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=products[(index + offset) % size], quantity=1, price_snapshot=Decimal('9.99'))
+        for index, order in enumerate(orders) for offset in range(min(2, size))
+    ])
+    return user, [product.id for product in products]
@@ -0,0 +1,105 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+
+class LookupCache:
+    """
+    Bounded in-process LRU cache with a TTL for small, rarely changing lookups.
+
+    Entries live in a per-process dict, so a hit costs no network round trip.
+    With `shared=True` misses fall through to the Django cache before the
+    loader runs, so processes warm each other up. Other processes only notice
+    an invalidation when their local entry expires, which bounds staleness by
+    `ttl`. Values are copied on the way out, callers may modify what they get.
+    Loaders returning None are not cached.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60, shared: bool = False):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Get a cached value
+        Args:
+            key: Hashable, string-convertible lookup key
+        Returns:
+            Copy of the cached value, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return copy.copy(entry[1])
+
+        if not self.shared:
+            return None
+        value = cache.get(self._shared_key(key))
+        if value is not None:
+            self._store(key, value)
+        return copy.copy(value)
+
+    def set(self, key, value) -> None:
+        """
+        Cache a value in this process and, when shared, in the Django cache
+        Args:
+            key: Hashable, string-convertible lookup key
+            value: Value to cache, None is ignored
+        """
+        if value is None:
+            return
+        self._store(key, value)
+        if self.shared:
+            cache.set(self._shared_key(key), value, self.ttl)
+
+    def get_or_load(self, key, loader):
+        """
+        Get a cached value, loading and caching it on a miss
+        Args:
+            key: Hashable, string-convertible lookup key
+            loader: Callable returning the value, or None when it does not exist
+        Returns:
+            Copy of the cached or loaded value, or None
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = loader()
+        self.set(key, value)
+        return copy.copy(value)
+
+    def invalidate(self, *keys) -> None:
+        """
+        Drop entries from this process and from the shared cache
+        Args:
+            keys: Keys to drop
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if self.shared and keys:
+            cache.delete_many([self._shared_key(key) for key in keys])
+
+    def clear(self) -> None:
+        """Drop every entry held by this process"""
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _shared_key(self, key) -> str:
+        return f"lookup:{self.name}:{key}"
@@ -0,0 +1,86 @@
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.benchmarks import Rollback, seed_benchmark_data
+from apps.core.parsers import ORJSONParser
+from apps.core.renderers import ORJSONRenderer, orjson
+from apps.orders.api.serializers import OrderSerializer
+from apps.orders.models import Order, OrderItem
+from apps.products.api.serializers import ProductListSerializer, ProductSerializer
+from apps.products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the stdlib JSON renderer and parser with the orjson ones on large product and order lists. "
+        "Fails when the rendered bytes differ. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,5000', help="Comma separated list sizes")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per implementation, best is reported")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed, both sides use the stdlib encoder"))
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        self.repeat = options['repeat']
+        self.divergent = []
+        try:
+            with transaction.atomic():
+                for size in sizes:
+                    self.run_size(size)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if self.divergent:
+            raise CommandError(f"orjson renderer output diverges for: {', '.join(self.divergent)}")
+        self.stdout.write(self.style.SUCCESS("orjson renderer output matches for every payload"))
+
+    def run_size(self, size):
+        user, products = seed_benchmark_data(size)
+        products = Product.objects.filter(id__in=products).select_related('category')
+        payloads = [
+            ('product-list', ProductListSerializer(products, many=True).data),
+            ('product', ProductSerializer(products.prefetch_related('images'), many=True).data),
+            ('order', OrderSerializer(
+                Order.objects.filter(user=user).prefetch_related(
+                    Prefetch('items', OrderItem.objects.select_related('product'))
+                ),
+                many=True,
+            ).data),
+        ]
+        for name, data in payloads:
+            stdlib_time, stdlib_bytes = self.measure(lambda: JSONRenderer().render(data))
+            fast_time, fast_bytes = self.measure(lambda: ORJSONRenderer().render(data))
+            matches = stdlib_bytes == fast_bytes
+            if not matches:
+                self.divergent.append(f"{name} x{size}")
+            self.report('render', name, size, stdlib_time, fast_time, 'ok' if matches else 'DIVERGED')
+
+            parse_time, _ = self.measure(lambda: JSONParser().parse(BytesIO(stdlib_bytes)))
+            fast_parse_time, _ = self.measure(lambda: ORJSONParser().parse(BytesIO(stdlib_bytes)))
+            self.report('parse', name, size, parse_time, fast_parse_time, f'{len(stdlib_bytes) / 1024:.0f} KiB')
+
+    def report(self, operation, name, size, stdlib_time, fast_time, note):
+        self.stdout.write(
+            f"{operation:<7} {name:<13} {size:>6}  json {stdlib_time:8.2f} ms  orjson {fast_time:8.2f} ms  "
+            f"x{stdlib_time / fast_time if fast_time else 0:5.1f}  {note}"
+        )
+
+    def measure(self, function):
+        best, result = None, None
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            result = function()
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
@@ -0,0 +1,92 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from apps.cart.api.fast_serializers import serialize_carts
+from apps.cart.api.serializers import CartSerializer
+from apps.cart.models import Cart, CartItem
+from apps.core.benchmarks import Rollback, seed_benchmark_data
+from apps.orders.api.fast_serializers import serialize_orders
+from apps.orders.api.serializers import OrderSerializer
+from apps.orders.models import Order, OrderItem
+from apps.products.api.fast_serializers import serialize_products
+from apps.products.api.serializers import ProductSerializer
+from apps.products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF serializers with the fast read-only serializers on seeded payloads. "
+        "Fails when the rendered JSON differs. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1000', help="Comma separated payload sizes")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per implementation, best is reported")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        self.repeat = options['repeat']
+        self.divergent = []
+        try:
+            with transaction.atomic():
+                for size in sizes:
+                    self.run_size(size)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if self.divergent:
+            raise CommandError(f"Fast serializer output diverges for: {', '.join(self.divergent)}")
+        self.stdout.write(self.style.SUCCESS("Fast serializer output matches for every payload"))
+
+    def run_size(self, size):
+        user, products = seed_benchmark_data(size)
+        # Baselines are the best DRF can do: one query per relation, products joined to their line items
+        cart_items = Prefetch('items', CartItem.objects.select_related('product'))
+        order_items = Prefetch('items', OrderItem.objects.select_related('product'))
+        cases = [
+            (
+                'product', size,
+                lambda: ProductSerializer(
+                    Product.objects.filter(id__in=products).select_related('category').prefetch_related('images'),
+                    many=True,
+                ).data,
+                lambda: serialize_products(list(Product.objects.filter(id__in=products).select_related('category'))),
+            ),
+            (
+                'cart', size,
+                lambda: CartSerializer(Cart.objects.prefetch_related(cart_items).get(user=user)).data,
+                lambda: serialize_carts([Cart.objects.get(user=user)])[0],
+            ),
+            (
+                'order', size,
+                lambda: OrderSerializer(
+                    Order.objects.filter(user=user).prefetch_related(order_items), many=True
+                ).data,
+                lambda: serialize_orders(list(Order.objects.filter(user=user))),
+            ),
+        ]
+        for name, count, drf, fast in cases:
+            drf_time, drf_data = self.measure(drf)
+            fast_time, fast_data = self.measure(fast)
+            renderer = JSONRenderer()
+            matches = renderer.render(drf_data) == renderer.render(fast_data)
+            if not matches:
+                self.divergent.append(f"{name} x{count}")
+            self.stdout.write(
+                f"{name:<8} {count:>6}  drf {drf_time:8.2f} ms  fast {fast_time:8.2f} ms  "
+                f"x{drf_time / fast_time if fast_time else 0:5.1f}  {'ok' if matches else 'DIVERGED'}"
+            )
+
+    def measure(self, function):
+        best, result = None, None
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            result = function()
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,29 @@
+from .routers import end_request, pin_to_primary, start_request
+
+
+class ReplicaPinningMiddleware:
+    """
+    Track database routing per request for ReplicaRouter.
+
+    When a request wrote to the primary, the authenticated user's reads are
+    pinned to the primary for DATABASE_REPLICA_PIN_SECONDS so they never read
+    their own change back from a lagging replica. Must come after
+    AuthenticationMiddleware; DRF views set `request.user` once they
+    authenticate.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state, token = start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+
+        if state.wrote:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.pk)
+        return response
@@ -0,0 +1,105 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.permissions import SAFE_METHODS
+
+from .routers import allow_replica_reads, is_pinned_to_primary
+from .serializers import FastSerializer, has_sparse_fieldset
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET and HEAD requests with `304 Not Modified` when the client's
+    `If-None-Match` / `If-Modified-Since` validators still match.
+
+    Views override `get_conditional_validators`, which must be cheap: it runs
+    before the object is loaded or serialized. Successful responses carry the
+    same strong `ETag` and `Last-Modified` headers. Without an override every
+    request is served in full.
+    """
+
+    def get_conditional_validators(self, request, *args, **kwargs):
+        """
+        Returns:
+            Tuple of (etag parts, last modified unix timestamp); parts of None skip conditional handling
+        """
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        etag_parts, last_modified = self.get_conditional_validators(request, *args, **kwargs)
+        if etag_parts is None:
+            return super().get(request, *args, **kwargs)
+
+        # The negotiated media type is part of the representation, so it is part of the validator
+        etag_source = ':'.join(str(part) for part in (*etag_parts, request.accepted_media_type))
+        etag = quote_etag(hashlib.md5(etag_source.encode('utf-8')).hexdigest())
+        last_modified = int(last_modified) if last_modified is not None else None
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class SparseFieldsetViewMixin:
+    """
+    Push `?fields=` / `?omit=` down to the queryset of generic views whose
+    serializer uses `SparseFieldsetMixin`. Runs after the filter backends so
+    ordering added by them is known.
+
+    Views may set `fast_serializer` to a function from `fast_serializers`
+    modules; reads that ask for the full representation then skip DRF fields
+    and prefetches, and the function loads nested rows itself.
+    """
+    fast_serializer = None
+
+    def use_fast_serializer(self):
+        return (
+            self.fast_serializer is not None
+            and self.request.method in SAFE_METHODS
+            and not has_sparse_fieldset(self.request)
+        )
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.use_fast_serializer():
+            return queryset.prefetch_related(None)
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'optimize_queryset'):
+            queryset = serializer_class.optimize_queryset(queryset, self.request)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if args and self.use_fast_serializer():
+            return FastSerializer(type(self).fast_serializer, args[0], many=kwargs.get('many', False))
+        return super().get_serializer(*args, **kwargs)
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests of a view from a read replica.
+
+    Runs after authentication, so a user who wrote recently is kept on the
+    primary. Unsafe methods and anything the request writes afterwards stay on
+    the primary, see `apps.core.routers.ReplicaRouter`. Views can keep other
+    requests on the primary by overriding `can_read_from_replica`.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS:
+            return
+        if request.user.is_authenticated and is_pinned_to_primary(request.user.pk):
+            return
+        if self.can_read_from_replica(request):
+            allow_replica_reads()
+
+    def can_read_from_replica(self, request) -> bool:
+        return True
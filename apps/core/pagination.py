@@ -0,0 +1,185 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on every column of the queryset ordering.
+
+    The primary key is appended as a tie-breaker, so each page is a single
+    `WHERE (ordering) > (cursor) ORDER BY ... LIMIT n` query that can walk a
+    composite index such as (created_at, id) or (price, id). No COUNT(*) and no
+    OFFSET are issued. Ordering fields must be non-nullable.
+
+    Clients that still need page numbers opt in with `?page=N`, which delegates
+    the request to `PageNumberPagination`.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    page_number_class = PageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_number_paginator = None
+        if self.page_number_class.page_query_param in request.query_params:
+            self.page_number_paginator = self.page_number_class()
+            return self.page_number_paginator.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor['reverse']
+        order_by = [_invert(field) for field in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*order_by)
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_seek_filter(order_by, self.cursor['position']))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_html_context()
+        return super().get_html_context()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.page_number_class.page_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Opt in to page-number pagination instead of cursors.',
+            'schema': {'type': 'integer'},
+        })
+        return parameters
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ImproperlyConfigured(f"{self.__class__.__name__} only supports ordering by field names.")
+
+        pk_name = queryset.model._meta.pk.name
+        ordering = [field.replace('pk', pk_name) if field.lstrip('-') == 'pk' else field for field in ordering]
+        if not any(field.lstrip('-') == pk_name for field in ordering):
+            ordering.append(pk_name if ordering and not ordering[0].startswith('-') else f'-{pk_name}')
+
+        self.queryset_fields = {
+            field.lstrip('-'): _get_output_field(queryset, field.lstrip('-')) for field in ordering
+        }
+        return ordering
+
+    def get_seek_filter(self, order_by, position):
+        """
+        Build the filter that selects rows strictly after the cursor position
+        Args:
+            order_by: Ordering used for this page, possibly inverted for previous pages
+            position: Decoded values of the ordering columns at the cursor
+        Returns:
+            Q object equivalent to a row comparison on the ordering columns
+        """
+        seek = Q()
+        for index, field in enumerate(order_by):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition = Q(**{f'{field.lstrip("-")}__{lookup}': position[index]})
+            for previous_field, previous_value in zip(order_by[:index], position[:index]):
+                condition &= Q(**{previous_field.lstrip('-'): previous_value})
+            seek |= condition
+
+        # Redundant bound on the leading column so the planner can use an index range scan
+        leading = order_by[0]
+        bound = 'lte' if leading.startswith('-') else 'gte'
+        return Q(**{f'{leading.lstrip("-")}__{bound}': position[0]}) & seek
+
+    def get_next_link(self):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_next_link()
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if payload['o'] != self.ordering or len(payload['p']) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.queryset_fields[field.lstrip('-')].to_python(value)
+                for field, value in zip(self.ordering, payload['p'])
+            ]
+            return {'position': position, 'reverse': bool(payload['r'])}
+        except (BinasciiError, UnicodeError, KeyError, IndexError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse):
+        position = [_encode_value(getattr(instance, self._get_attname(field))) for field in self.ordering]
+        payload = json.dumps({'o': self.ordering, 'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_attname(self, field):
+        output_field = self.queryset_fields[field.lstrip('-')]
+        return getattr(output_field, 'attname', None) or field.lstrip('-')
+
+
+def _invert(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+def _get_output_field(queryset, name):
+    try:
+        return queryset.model._meta.get_field(name)
+    except FieldDoesNotExist:
+        annotation = queryset.query.annotations.get(name)
+        if annotation is None:
+            raise ImproperlyConfigured(f"Cannot paginate on unknown ordering field '{name}'.")
+        return annotation.output_field
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
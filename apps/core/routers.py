@@ -0,0 +1,111 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_CACHE_KEY = 'db:primary_pin:{user_id}'
+
+# Routing state of the current request, see ReplicaPinningMiddleware. None outside requests.
+_routing_state = ContextVar('db_routing_state', default=None)
+
+
+class RoutingState:
+    """Per-request routing decisions"""
+
+    def __init__(self):
+        # Set by ReplicaReadMixin for safe requests of users that are not pinned to the primary
+        self.replica_reads = False
+        # Set on the first write, later reads of the request and the user's next requests use the primary
+        self.wrote = False
+        self.replica = None
+
+
+def get_replica_aliases() -> list:
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def start_request() -> tuple:
+    """
+    Give the current request a fresh routing state
+    Returns:
+        Tuple of (state, token to pass to end_request)
+    """
+    state = RoutingState()
+    return state, _routing_state.set(state)
+
+
+def end_request(token) -> None:
+    _routing_state.reset(token)
+
+
+def allow_replica_reads() -> None:
+    """Let the rest of the current request read from a replica until it writes"""
+    state = _routing_state.get()
+    if state is not None:
+        state.replica_reads = True
+
+
+def get_read_database() -> str:
+    """
+    Pick the database reads of the current request should use
+    Returns:
+        A replica alias when replica reads are allowed and no write or transaction is in progress, else the primary
+    """
+    state = _routing_state.get()
+    replicas = get_replica_aliases()
+    if state is None or not replicas or not state.replica_reads or state.wrote:
+        return DEFAULT_DB_ALIAS
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        # Reads inside transaction.atomic() must see the transaction's own writes
+        return DEFAULT_DB_ALIAS
+    if state.replica is None:
+        # One replica per request, so the request reads a single consistent snapshot
+        state.replica = random.choice(replicas)
+    return state.replica
+
+
+def pin_to_primary(user_id: int) -> None:
+    """
+    Route a user's reads to the primary for DATABASE_REPLICA_PIN_SECONDS, until replicas catch up with their write
+    Args:
+        user_id: ID of the user who wrote
+    """
+    cache.set(PIN_CACHE_KEY.format(user_id=user_id), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id: int) -> bool:
+    return bool(cache.get(PIN_CACHE_KEY.format(user_id=user_id)))
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replicas listed in DATABASE_REPLICAS and everything else to the primary.
+
+    Reads only go to a replica when the view opted in with ReplicaReadMixin
+    and nothing has been written in the request. Writes, select_for_update()
+    and get_or_create() use `db_for_write`, and reads inside an atomic block
+    stay on the primary. Replicas are never migrated, they replicate the
+    primary's schema.
+    """
+
+    def db_for_read(self, model, **hints):
+        return get_read_database()
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replica_aliases():
+            return False
+        return None
@@ -0,0 +1,246 @@
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def has_sparse_fieldset(request) -> bool:
+    query_params = getattr(request, 'query_params', request.GET)
+    return FIELDS_PARAM in query_params or OMIT_PARAM in query_params
+
+
+def parse_field_list(query_params, name: str) -> list:
+    """
+    Read a comma separated field list from the query string
+    Args:
+        query_params: QueryDict of request query parameters
+        name: Parameter name, may be repeated
+    Returns:
+        List of non-empty field names, or None if the parameter is absent
+    """
+    if name not in query_params:
+        return None
+    return [field.strip() for value in query_params.getlist(name) for field in value.split(',') if field.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin for `?fields=a,b` and `?omit=c` on read requests.
+
+    Only top-level readable fields are trimmed. `optimize_queryset` and
+    `prefetch_instance` push the same selection down to the database: columns
+    of unused fields are deferred with `.only()` and unused joins and
+    prefetches are skipped.
+
+    Output fields that are not plain model columns declare the ORM paths they
+    read in `Meta.sparse_field_sources`. Paths through a foreign key become
+    `select_related`, paths through a reverse or many-to-many relation become
+    `prefetch_related`. When a selected field cannot be resolved, every column
+    is loaded.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or not self._is_root():
+            return fields
+
+        selected = self.get_selected_field_names(request, fields)
+        if selected is None:
+            return fields
+        return {
+            name: field for name, field in fields.items()
+            if field.write_only or name in selected
+        }
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    @classmethod
+    def get_selected_field_names(cls, request, fields) -> set:
+        """
+        Get the readable fields requested with the fields and omit parameters
+        Args:
+            request: Request carrying the query string
+            fields: Dict of the serializer's fields
+        Returns:
+            Set of field names, or None when the full representation is requested
+        """
+        if request.method not in SAFE_METHODS:
+            return None
+        query_params = getattr(request, 'query_params', request.GET)
+        only, omit = parse_field_list(query_params, FIELDS_PARAM), parse_field_list(query_params, OMIT_PARAM)
+        if only is None and omit is None:
+            return None
+
+        selected = {name for name, field in fields.items() if not field.write_only}
+        if only is not None:
+            selected &= set(only)
+        if omit is not None:
+            selected -= set(omit)
+        return selected
+
+    @classmethod
+    def get_queryset_plan(cls, request, model) -> tuple:
+        """
+        Work out what the selected fields need from the database
+        Args:
+            request: Request carrying the query string
+            model: Model the serializer reads
+        Returns:
+            Tuple of (columns for only() or None to load all, select_related paths, prefetch_related paths)
+        """
+        fields = cls().get_fields()
+        selected = cls.get_selected_field_names(request, fields)
+        sparse = selected is not None
+        if not sparse:
+            selected = {name for name, field in fields.items() if not field.write_only}
+
+        declared = getattr(getattr(cls, 'Meta', None), 'sparse_field_sources', {})
+        columns, select, prefetch = set(), set(), set()
+        for name in selected:
+            # Fields are unbound here, so an unset source means the field name
+            source = fields[name].source or name
+            if name in declared:
+                paths = declared[name]
+            elif source == '*':
+                # Method fields read the whole instance and did not declare what they need
+                sparse = False
+                continue
+            else:
+                paths = [source.replace('.', '__')]
+            for path in paths:
+                if not _add_path(model, path, columns, select, prefetch):
+                    sparse = False
+        return (columns if sparse else None), select, prefetch
+
+    @classmethod
+    def optimize_queryset(cls, queryset, request):
+        """
+        Load only what the selected fields need
+        Args:
+            queryset: QuerySet the serializer will read
+            request: Request carrying the query string
+        Returns:
+            QuerySet with only(), select_related() and prefetch_related() set for the selection
+        """
+        columns, select, prefetch = cls.get_queryset_plan(request, queryset.model)
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if columns is not None:
+            # Ordering columns are read by cursor pagination, keep them loaded
+            ordering = [field.lstrip('-') for field in queryset.query.order_by or queryset.model._meta.ordering
+                        if isinstance(field, str)]
+            columns |= {field for field in ordering if _is_concrete(queryset.model, field)}
+            queryset = queryset.only(*columns)
+        return queryset
+
+    @classmethod
+    def prefetch_instance(cls, instance, request) -> None:
+        """
+        Load the relations the selected fields need for an instance fetched without a queryset
+        Args:
+            instance: Model instance the serializer will read
+            request: Request carrying the query string
+        """
+        _, select, prefetch = cls.get_queryset_plan(request, type(instance))
+        lookups = sorted(select | prefetch)
+        if lookups:
+            prefetch_related_objects([instance], *lookups)
+
+
+class FastSerializer:
+    """
+    Give a fast serializing function the `.data` interface generic views use.
+
+    Fast serializers take a list of instances and return plain dicts equal to
+    the DRF serializer output, reading nested rows with `.values()` instead of
+    building nested serializers.
+    """
+
+    def __init__(self, function, instance, many=False):
+        self.function = function
+        self.instance = instance
+        self.many = many
+
+    @property
+    def data(self):
+        if self.many:
+            return self.function(list(self.instance))
+        return self.function([self.instance])[0]
+
+
+def format_decimal(value, decimal_places: int = 2) -> str:
+    """
+    Format a decimal exactly like a DRF DecimalField with coerce_to_string
+    Args:
+        value: Decimal or number
+        decimal_places: Places the field quantizes to
+    Returns:
+        Fixed-point string
+    """
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value).strip())
+    return f"{value.quantize(Decimal('.1') ** decimal_places):f}"
+
+
+def format_datetime(value) -> str:
+    """
+    Format a datetime exactly like a DRF DateTimeField with ISO 8601 output
+    Args:
+        value: Aware datetime
+    Returns:
+        ISO 8601 string in the current time zone, with Z for UTC
+    """
+    if not value:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _is_concrete(model, name):
+    try:
+        return model._meta.get_field(name).concrete
+    except FieldDoesNotExist:
+        return False
+
+
+def _add_path(model, path, columns, select, prefetch) -> bool:
+    """
+    Classify an ORM path into columns, joins and prefetches
+    Returns:
+        False if the path does not resolve to model fields
+    """
+    parts = path.split('__')
+    current = model
+    for index, part in enumerate(parts):
+        try:
+            field = current._meta.get_field(part)
+        except FieldDoesNotExist:
+            return False
+        prefix = '__'.join(parts[:index + 1])
+        if not field.is_relation:
+            columns.add(prefix)
+            return True
+        if field.one_to_many or field.many_to_many:
+            prefetch.add(path)
+            return True
+        if field.concrete:
+            columns.add(prefix)
+        select.add(prefix)
+        current = field.related_model
+    return True
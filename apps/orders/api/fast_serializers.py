@@ -0,0 +1,34 @@
+from collections import defaultdict
+
+from apps.cart.api.fast_serializers import LINE_ITEM_VALUES, serialize_line_item
+from apps.core.serializers import format_datetime
+from ..models import OrderItem
+
+
+def serialize_orders(orders: list) -> list:
+    """
+    Read-only equivalent of OrderSerializer
+    Args:
+        orders: Order instances
+    Returns:
+        List of dicts equal to OrderSerializer(orders, many=True).data
+    """
+    items = defaultdict(list)
+    rows = OrderItem.objects.filter(
+        order_id__in=[order.id for order in orders]
+    ).order_by('id').values('order_id', *LINE_ITEM_VALUES)
+    for row in rows:
+        items[row['order_id']].append(row)
+
+    return [
+        {
+            'id': order.id,
+            'user': order.user_id,
+            'status': order.status,
+            'created_at': format_datetime(order.created_at),
+            'updated_at': format_datetime(order.updated_at),
+            'items': [serialize_line_item(row) for row in items[order.id]],
+            'total_price': sum(row['quantity'] * row['price_snapshot'] for row in items[order.id]),
+        }
+        for order in orders
+    ]
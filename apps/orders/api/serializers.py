@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from apps.cart.api.serializers import ProductMiniSerializer
+from apps.core.serializers import SparseFieldsetMixin
 from ..models import Order, OrderItem
 
 
@@ -18,7 +19,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
         return obj.quantity * obj.price_snapshot
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     total_price = serializers.SerializerMethodField()
 
@@ -26,6 +27,10 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ['id', 'user', 'status', 'created_at', 'updated_at', 'items', 'total_price']
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        sparse_field_sources = {
+            'items': ['items__product'],
+            'total_price': ['items'],
+        }
 
     def get_total_price(self, obj):
         return sum(item.quantity * item.price_snapshot for item in obj.items.all())
@@ -5,6 +5,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.mixins import ReplicaReadMixin, SparseFieldsetViewMixin
+from apps.core.pagination import KeysetPagination
+from .fast_serializers import serialize_orders
 from .serializers import OrderSerializer
 from .. import selectors
 from ..models import Order
@@ -36,17 +39,20 @@ class CheckoutView(APIView):
             )
 
 
-class OrderListView(generics.ListAPIView):
+class OrderListView(ReplicaReadMixin, SparseFieldsetViewMixin, generics.ListAPIView):
     serializer_class = OrderSerializer
+    fast_serializer = serialize_orders
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
         return selectors.get_user_orders(user)
 
 
-class OrderDetailView(generics.RetrieveAPIView):
+class OrderDetailView(ReplicaReadMixin, SparseFieldsetViewMixin, generics.RetrieveAPIView):
     serializer_class = OrderSerializer
+    fast_serializer = serialize_orders
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
@@ -54,6 +60,8 @@ class OrderDetailView(generics.RetrieveAPIView):
         order = selectors.get_order_by_id(order_id)
         if order is None or order.user != self.request.user:
             raise ValidationError("Order not found")
+        if not self.use_fast_serializer():
+            OrderSerializer.prefetch_instance(order, self.request)
         return order
 
 
@@ -114,9 +122,11 @@ class UpdateOrderStatusView(APIView):
             )
 
 
-class AdminOrderListView(generics.ListAPIView):
+class AdminOrderListView(ReplicaReadMixin, SparseFieldsetViewMixin, generics.ListAPIView):
     serializer_class = OrderSerializer
+    fast_serializer = serialize_orders
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         if not self.request.user.is_staff:
@@ -25,6 +25,10 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['user', 'created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.user.first_name} - {self.status}"
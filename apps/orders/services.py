@@ -2,11 +2,12 @@ import logging
 
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import F
 
 from .models import Order, OrderItem
 from ..cart.models import Cart
+from ..cart.stores import CachedCartStore, cart_cache_enabled
 from ..products.models import Product
+from ..products.services import InventoryService
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,9 @@ class OrderService:
     @staticmethod
     @transaction.atomic
     def create_order_from_cart(user_id, shipping_address=None):
+        if cart_cache_enabled():
+            # Write the live cart into this transaction; its row lock keeps the snapshot stable until commit
+            CachedCartStore.flush_for_checkout(user_id)
         try:
             cart = Cart.objects.select_for_update().get(user_id=user_id)
         except Cart.DoesNotExist:
@@ -70,11 +74,10 @@ class OrderService:
                 quantity=cart_item.quantity,
                 price_snapshot=cart_item.price_snapshot
             )
-            Product.objects.filter(id=cart_item.product_id).update(
-                stock_quantity=F('stock_quantity') - cart_item.quantity
-            )
+            InventoryService.adjust_stock(cart_item.product_id, -cart_item.quantity)
 
         cart.items.all().delete()
+        Cart.objects.filter(id=cart.id).update(item_count=0, subtotal=0)
         return order
 
     @staticmethod
@@ -105,9 +108,7 @@ class OrderService:
         order.save()
 
         for item in order.items.select_related('product').all():
-            Product.objects.filter(id=item.product_id).update(
-                stock_quantity=F('stock_quantity') + item.quantity
-            )
+            InventoryService.adjust_stock(item.product_id, item.quantity)
 
     @staticmethod
     def update_order_status(order, new_status):
@@ -1,3 +1,186 @@
-from django.test import TestCase
+import time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIClient
+
+from apps.core.routers import (
+    ReplicaRouter,
+    allow_replica_reads,
+    end_request,
+    is_pinned_to_primary,
+    start_request,
+)
+from .api.serializers import OrderSerializer
+from .models import Order, OrderItem
+from .services import OrderService
+from ..accounts.models import CustomUser
+from ..cart.services import CartService
+from ..products.cache import CATALOG_MODIFIED_KEY, bump_catalog_version
+from ..products.models import Category, Product
+
+
+class OrderSparseFieldsetTest(APITestCase):
+    """Test ?fields= and ?omit= on order endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', password='BuyerPassword123!')
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name='Phones', slug='phones')
+        products = [
+            Product.objects.create(
+                name=f'Phone {index}', slug=f'phone-{index}', description='', price=Decimal('10.00'),
+                stock_quantity=5, category=category,
+            )
+            for index in range(2)
+        ]
+        for _ in range(3):
+            order = Order.objects.create(user=self.user, total_amount=Decimal('20.00'), shipping_address='Street 1')
+            for product in products:
+                OrderItem.objects.create(order=order, product=product, quantity=1, price_snapshot=product.price)
+
+    def test_full_list_uses_fast_serializer(self):
+        """Test the full representation costs orders + line items and matches OrderSerializer"""
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('order-list'))
+        self.assertEqual(len(response.data['results'][0]['items']), 2)
+        self.assertEqual(response.data['results'][0]['total_price'], Decimal('20.00'))
+        expected = OrderSerializer(Order.objects.filter(user=self.user), many=True).data
+        self.assertEqual(
+            JSONRenderer().render(response.data['results']),
+            JSONRenderer().render(expected),
+        )
+
+    def test_omit_items_skips_prefetch(self):
+        """Test omitting items and totals leaves a single order query"""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order-list'), {'omit': 'items,total_price'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'user', 'status', 'created_at', 'updated_at'})
+
+    def test_detail_fields(self):
+        """Test the detail endpoint honours the field selection"""
+        order = Order.objects.first()
+        response = self.client.get(reverse('order-detail', kwargs={'order_id': order.id}), {'fields': 'id,status'})
+        self.assertEqual(response.data, {'id': order.id, 'status': 'pending'})
+
+
+class CheckoutStockFreshnessTest(APITestCase):
+    """Test stock changed by orders reaches catalog validators"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', password='BuyerPassword123!')
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.product = Product.objects.create(
+            name='Phone', slug='phone', description='', price=Decimal('10.00'), stock_quantity=5, category=category,
+        )
+        CartService.add_product(self.user, self.product.id, 2)
+
+    def test_checkout_and_cancel_change_product_etag(self):
+        """Test a conditional product read after checkout or cancellation returns the new stock"""
+        url = reverse('product-detail', kwargs={'slug': 'phone'})
+        etag = self.client.get(url)['ETag']
+
+        order = OrderService.create_order_from_cart(self.user.id, 'Street 1')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stock_quantity'], 3)
+
+        OrderService.cancel_order(order)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stock_quantity'], 5)
+
+    def test_checkout_invalidates_cached_lists(self):
+        """Test cached product list pages and facets drop the stock a checkout sold"""
+        Product.objects.filter(id=self.product.id).update(stock_quantity=2)
+        self.assertEqual(self.client.get(reverse('product-list-create')).data['results'][0]['stock_quantity'], 2)
+        self.assertEqual(self.client.get(reverse('product-facets')).data['in_stock'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OrderService.create_order_from_cart(self.user.id, 'Street 1')
+        self.assertEqual(self.client.get(reverse('product-list-create')).data['results'][0]['stock_quantity'], 0)
+        self.assertEqual(self.client.get(reverse('product-facets')).data['in_stock'], 0)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRouterTest(SimpleTestCase):
+    """Test which database the replica router picks"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.state, self.token = start_request()
+
+    def tearDown(self):
+        end_request(self.token)
+
+    def test_reads_outside_opted_in_requests_use_primary(self):
+        """Test reads stay on the primary until a view allows replica reads"""
+        self.assertEqual(self.router.db_for_read(Order), 'default')
+        allow_replica_reads()
+        self.assertEqual(self.router.db_for_read(Order), 'replica_1')
+
+    def test_reads_after_write_use_primary(self):
+        """Test a write sends the rest of the request to the primary"""
+        allow_replica_reads()
+        self.assertEqual(self.router.db_for_write(Order), 'default')
+        self.assertTrue(self.state.wrote)
+        self.assertEqual(self.router.db_for_read(Order), 'default')
+
+    def test_reads_in_transaction_use_primary(self):
+        """Test reads inside an atomic block see the transaction"""
+        allow_replica_reads()
+        with mock.patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(Order), 'default')
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica_1', 'orders'))
+        self.assertIsNone(self.router.allow_migrate('default', 'orders'))
+
+
+class ReplicaPinningTest(APITestCase):
+    """Test users are kept on the primary after they write"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', password='BuyerPassword123!')
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.product = Product.objects.create(
+            name='Phone', slug='phone', description='', price=Decimal('10.00'), stock_quantity=5, category=category,
+        )
+
+    def test_order_history_pinned_after_write(self):
+        """Test order history is read from a replica unless the user just wrote"""
+        with mock.patch('apps.core.mixins.allow_replica_reads') as allow:
+            self.client.get(reverse('order-list'))
+        allow.assert_called_once()
+
+        response = self.client.post(reverse('add-cart-item'), {'product_id': self.product.id, 'quantity': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(is_pinned_to_primary(self.user.id))
+        with mock.patch('apps.core.mixins.allow_replica_reads') as allow:
+            self.client.get(reverse('order-list'))
+        allow.assert_not_called()
+
+    def test_catalog_reads_use_primary_after_change(self):
+        """Test catalog reads skip replicas until they caught up with a catalog change"""
+        self.client.force_authenticate(None)
+        bump_catalog_version()
+        with mock.patch('apps.core.mixins.allow_replica_reads') as allow:
+            self.client.get(reverse('product-detail', args=[self.product.slug]))
+        allow.assert_not_called()
+
+        cache.set(CATALOG_MODIFIED_KEY, time.time() - 60, timeout=None)
+        with mock.patch('apps.core.mixins.allow_replica_reads') as allow:
+            self.client.get(reverse('product-detail', args=[self.product.slug]))
+        allow.assert_called_once()
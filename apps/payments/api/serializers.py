@@ -2,6 +2,7 @@ from decimal import Decimal
 
 from rest_framework import serializers
 
+from apps.core.serializers import SparseFieldsetMixin
 from apps.orders.models import Order
 from ..models import Payment
 
@@ -13,7 +14,7 @@ class OrderSummarySerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     order = OrderSummarySerializer(read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     is_successful = serializers.BooleanField(read_only=True)
@@ -29,6 +30,14 @@ class PaymentSerializer(serializers.ModelSerializer):
             'is_failed', 'can_be_refunded', 'created_at', 'updated_at',
         ]
         read_only_fields = fields
+        sparse_field_sources = {
+            'order': ['order'],
+            'status_display': ['status'],
+            'is_successful': ['status'],
+            'is_pending': ['status'],
+            'is_failed': ['status'],
+            'can_be_refunded': ['status'],
+        }
 
 
 class PaymentStatusSerializer(serializers.ModelSerializer):
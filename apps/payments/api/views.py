@@ -8,6 +8,8 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.mixins import ReplicaReadMixin
+from apps.core.pagination import KeysetPagination
 from .serializers import (
     PaymentSerializer,
     PaymentStatusSerializer,
@@ -75,7 +77,7 @@ class PaymentDetailView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        serializer = PaymentSerializer(payment)
+        serializer = PaymentSerializer(payment, context={'request': request})
         return Response(serializer.data)
 
 
@@ -95,11 +97,11 @@ class PaymentByOrderView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        serializer = PaymentSerializer(payment)
+        serializer = PaymentSerializer(payment, context={'request': request})
         return Response(serializer.data)
 
 
-class PaymentListView(APIView):
+class PaymentListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -108,8 +110,11 @@ class PaymentListView(APIView):
             user=request.user,
             status=status_filter
         )
-        serializer = PaymentSerializer(payments, many=True)
-        return Response(serializer.data)
+        payments = PaymentSerializer.optimize_queryset(payments, request)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(payments, request, view=self)
+        serializer = PaymentSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class PaymentStatusView(APIView):
@@ -221,7 +226,7 @@ class SyncPaymentStatusView(APIView):
             )
 
 
-class PaymentStatisticsView(APIView):
+class PaymentStatisticsView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
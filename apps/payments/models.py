@@ -30,6 +30,7 @@ class Payment(models.Model):
         indexes = [
             models.Index(fields=['status', 'created_at']),
             models.Index(fields=['stripe_payment_intent_id']),
+            models.Index(fields=['created_at', 'id']),
         ]
 
     def __str__(self) -> str:
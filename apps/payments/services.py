@@ -7,12 +7,11 @@ import stripe
 from django.conf import settings
 from django.core.exceptions import ValidationError, PermissionDenied
 from django.db import transaction
-from django.db.models import F
 
 from .models import Payment
 from ..orders.models import Order
 from ..orders.services import OrderService
-from ..products.models import Product
+from ..products.services import InventoryService
 
 logger = logging.getLogger(__name__)
 
@@ -44,9 +43,7 @@ class PaymentService:
         order.status = Order.Status.CANCELLED
         order.save(update_fields=['status', 'updated_at'])
         for item in order.items.select_related('product').all():
-            Product.objects.filter(id=item.product_id).update(
-                stock_quantity=F('stock_quantity') + item.quantity
-            )
+            InventoryService.adjust_stock(item.product_id, item.quantity)
 
         logger.info(f"Order {order.id} cancelled and stock restored{f' ({reason})' if reason else ''}")
 
@@ -1,6 +1,24 @@
 from django.contrib import admin
 
+from .cache import bump_catalog_version
 from .models import Category, Product, ProductImage
+from .services import CategoryService, ProductService
+
+
+class CatalogVersionAdminMixin:
+    """Invalidate cached catalog responses after every admin write"""
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        bump_catalog_version()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_catalog_version()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_catalog_version()
 
 
 class ProductImageInline(admin.TabularInline):
@@ -11,35 +29,69 @@ class ProductImageInline(admin.TabularInline):
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['id', 'name', 'slug', 'get_products_count', 'created_at', 'updated_at']
+class CategoryAdmin(CatalogVersionAdminMixin, admin.ModelAdmin):
+    list_display = ['id', 'name', 'slug', 'parent', 'get_products_count', 'created_at', 'updated_at']
+    ordering = ['path']
     list_filter = ['created_at', 'updated_at']
     search_fields = ['name', 'slug']
     readonly_fields = ['created_at', 'updated_at']
     prepopulated_fields = {'slug': ('name',)}
 
     def get_products_count(self, obj):
-        return obj.products.count()
+        return obj.product_count
 
     get_products_count.short_description = 'Products Count'
+    get_products_count.admin_order_field = 'product_count'
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(CatalogVersionAdminMixin, admin.ModelAdmin):
     list_display = ['id', 'name', 'slug', 'category', 'price', 'stock_quantity', 'is_active', 'created_at',
                     'updated_at']
     list_filter = ['is_active', 'category', 'created_at', 'updated_at']
     search_fields = ['name', 'slug', 'description', 'category__name']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['primary_image_url', 'created_at', 'updated_at']
     prepopulated_fields = {'slug': ('name',)}
     inlines = [ProductImageInline]
     list_editable = ['is_active', 'stock_quantity']
 
+    def save_model(self, request, obj, form, change):
+        previous_category_id = form.initial.get('category')
+        super().save_model(request, obj, form, change)
+        CategoryService.refresh_product_counts(*{previous_category_id, obj.category_id} - {None})
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        ProductService.refresh_primary_image(form.instance.id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        CategoryService.refresh_product_counts(obj.category_id)
+
+    def delete_queryset(self, request, queryset):
+        category_ids = set(queryset.values_list('category_id', flat=True))
+        super().delete_queryset(request, queryset)
+        CategoryService.refresh_product_counts(*category_ids)
+
 
 @admin.register(ProductImage)
-class ProductImageAdmin(admin.ModelAdmin):
+class ProductImageAdmin(CatalogVersionAdminMixin, admin.ModelAdmin):
     list_display = ['id', 'product', 'image_url', 'is_primary', 'created_at']
     list_filter = ['is_primary', 'created_at']
     search_fields = ['product__name', 'image_url']
     readonly_fields = ['created_at']
     list_editable = ['is_primary']
+
+    def save_model(self, request, obj, form, change):
+        previous_product_id = form.initial.get('product')
+        super().save_model(request, obj, form, change)
+        ProductService.refresh_primary_image(*{previous_product_id, obj.product_id} - {None})
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        ProductService.refresh_primary_image(obj.product_id)
+
+    def delete_queryset(self, request, queryset):
+        product_ids = set(queryset.values_list('product_id', flat=True))
+        super().delete_queryset(request, queryset)
+        ProductService.refresh_primary_image(*product_ids)
@@ -0,0 +1,53 @@
+from collections import defaultdict
+
+from apps.core.serializers import format_decimal
+from ..models import ProductImage
+
+
+def serialize_category(category) -> dict:
+    """Same output as CategorySerializer"""
+    return {
+        'id': category.id,
+        'name': category.name,
+        'slug': category.slug,
+        'parent': category.parent_id,
+        'product_count': category.product_count,
+        'active_product_count': category.active_product_count,
+    }
+
+
+def serialize_products(products: list) -> list:
+    """
+    Read-only equivalent of ProductSerializer
+    Args:
+        products: Product instances loaded with select_related('category')
+    Returns:
+        List of dicts equal to ProductSerializer(products, many=True).data
+    """
+    images = defaultdict(list)
+    image_rows = ProductImage.objects.filter(
+        product_id__in=[product.id for product in products]
+    ).order_by('id').values_list('id', 'product_id', 'image_url', 'is_primary')
+    for image_id, product_id, image_url, is_primary in image_rows:
+        images[product_id].append({
+            'id': image_id,
+            'product': product_id,
+            'image_url': image_url,
+            'is_primary': is_primary,
+        })
+
+    return [
+        {
+            'id': product.id,
+            'name': product.name,
+            'slug': product.slug,
+            'description': product.description,
+            'price': format_decimal(product.price),
+            'stock_quantity': product.stock_quantity,
+            'is_active': product.is_active,
+            'category': serialize_category(product.category),
+            'primary_image_url': product.primary_image_url,
+            'images': images[product.id],
+        }
+        for product in products
+    ]
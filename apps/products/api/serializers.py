@@ -1,18 +1,40 @@
 from rest_framework import serializers
 
+from apps.core.serializers import SparseFieldsetMixin
+
 from ..models import Product, Category, ProductImage
 
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ['id', 'name', 'slug']
+        fields = ['id', 'name', 'slug', 'parent', 'product_count', 'active_product_count']
         extra_kwargs = {
             'id': {'read_only': True},
+            'product_count': {'read_only': True},
+            'active_product_count': {'read_only': True},
             'name': {'required': True},
-            'slug': {'required': True}
+            'slug': {'required': True},
+            'parent': {'required': False},
         }
 
+    def validate_parent(self, parent):
+        if parent is not None and self.instance is not None and parent.path.startswith(self.instance.path):
+            raise serializers.ValidationError("A category cannot be moved under itself or one of its descendants.")
+        return parent
+
+
+class CategoryTreeSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    slug = serializers.SlugField(read_only=True)
+    product_count = serializers.IntegerField(read_only=True)
+    active_product_count = serializers.IntegerField(read_only=True)
+    children = serializers.SerializerMethodField()
+
+    def get_children(self, node) -> list:
+        return CategoryTreeSerializer(node['children'], many=True).data
+
 
 class CategoryProductSerializer(serializers.ModelSerializer):
     class Meta:
@@ -21,11 +43,10 @@ class CategoryProductSerializer(serializers.ModelSerializer):
 
 
 class CategoryDetailSerializer(serializers.ModelSerializer):
-    products = CategoryProductSerializer(many=True, read_only=True)
-
     class Meta:
         model = Category
-        fields = ['id', 'name', 'slug', 'products']
+        fields = ['id', 'name', 'slug', 'parent', 'product_count', 'active_product_count']
+        read_only_fields = fields
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
@@ -40,7 +61,7 @@ class ProductImageSerializer(serializers.ModelSerializer):
         }
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     category_id = serializers.IntegerField(write_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
@@ -57,6 +78,7 @@ class ProductSerializer(serializers.ModelSerializer):
             'is_active',
             'category',
             'category_id',
+            'primary_image_url',
             'images',
         ]
         extra_kwargs = {
@@ -68,5 +90,76 @@ class ProductSerializer(serializers.ModelSerializer):
             'is_active': {'required': False, 'default': True},
             'category_id': {'required': True}
         }
+        sparse_field_sources = {
+            'category': ['category'],
+            'images': ['images'],
+        }
+
+
+class ProductListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    category = CategorySerializer(read_only=True)
+
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'slug', 'price', 'stock_quantity', 'is_active', 'category', 'primary_image_url']
+        read_only_fields = fields
+        sparse_field_sources = {
+            'category': ['category'],
+        }
+
+
+class ProductSuggestionSerializer(serializers.Serializer):
+    name = serializers.CharField(read_only=True)
+    slug = serializers.SlugField(read_only=True)
+
+
+class CategoryFacetSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    slug = serializers.SlugField(read_only=True)
+    count = serializers.IntegerField(read_only=True)
+
+
+class PriceBucketSerializer(serializers.Serializer):
+    min = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    max = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True, allow_null=True)
+    count = serializers.IntegerField(read_only=True)
+
+
+class ProductFacetsSerializer(serializers.Serializer):
+    total = serializers.IntegerField(read_only=True)
+    in_stock = serializers.IntegerField(read_only=True)
+    categories = CategoryFacetSerializer(many=True, read_only=True)
+    price_buckets = PriceBucketSerializer(many=True, read_only=True)
+
+
+class BulkProductUpdateItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(required=False)
+    slug = serializers.SlugField(required=False)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    stock_quantity = serializers.IntegerField(min_value=0, required=False)
+    is_active = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if ('id' in attrs) == ('slug' in attrs):
+            raise serializers.ValidationError("Provide either id or slug.")
+        if not any(field in attrs for field in ('price', 'stock_quantity', 'is_active')):
+            raise serializers.ValidationError("Provide at least one of price, stock_quantity or is_active.")
+        return attrs
+
+
+class CategoryPriceAdjustmentSerializer(serializers.Serializer):
+    category_id = serializers.IntegerField()
+    percentage = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=-100, required=False)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+
+    def validate(self, attrs):
+        if ('percentage' in attrs) == ('amount' in attrs):
+            raise serializers.ValidationError("Provide either percentage or amount.")
+        return attrs
 
 
+class BulkProductUpdateSerializer(serializers.Serializer):
+    # Items are validated one by one so a bad row is reported instead of rejecting the whole request
+    items = serializers.ListField(child=serializers.DictField(), required=False, default=list, max_length=10000)
+    category_adjustments = CategoryPriceAdjustmentSerializer(many=True, required=False, default=list)
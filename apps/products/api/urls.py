@@ -3,7 +3,12 @@ from django.urls import path
 from .views import (
     ProductListCreateView,
     ProductDetailView,
+    ProductSuggestView,
+    ProductFacetsView,
+    ProductExportView,
+    ProductBulkUpdateView,
     CategoryListCreateView,
+    CategoryTreeView,
     CategoryDetailView,
     ProductImageUploadView,
     ProductImageDetailView,
@@ -12,6 +17,11 @@ from .views import (
 urlpatterns = [
     path('', ProductListCreateView.as_view(), name='product-list-create'),
     path('categories/', CategoryListCreateView.as_view(), name='category-list-create'),
+    path('categories/tree/', CategoryTreeView.as_view(), name='category-tree'),
+    path('facets/', ProductFacetsView.as_view(), name='product-facets'),
+    path('export/', ProductExportView.as_view(), name='product-export'),
+    path('bulk/', ProductBulkUpdateView.as_view(), name='product-bulk-update'),
+    path('suggest/', ProductSuggestView.as_view(), name='product-suggest'),
     path('<slug:slug>/', ProductDetailView.as_view(), name='product-detail'),
     path('<slug:slug>/images/', ProductImageUploadView.as_view(), name='product-image-upload'),
     path('categories/<slug:slug>/', CategoryDetailView.as_view(), name='category-detail'),
@@ -1,6 +1,10 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.generics import (
+    GenericAPIView,
     ListCreateAPIView,
     RetrieveUpdateDestroyAPIView,
 )
@@ -10,37 +14,177 @@ from rest_framework.views import APIView
 
 from .serializers import (
     ProductSerializer,
+    ProductListSerializer,
     CategorySerializer,
     CategoryDetailSerializer,
+    CategoryTreeSerializer,
+    CategoryProductSerializer,
     ProductImageSerializer,
+    ProductSuggestionSerializer,
+    ProductFacetsSerializer,
+    BulkProductUpdateSerializer,
+    BulkProductUpdateItemSerializer,
 )
+from apps.core.mixins import ConditionalGetMixin, ReplicaReadMixin, SparseFieldsetViewMixin
+from apps.core.pagination import KeysetPagination
+from apps.core.routers import get_read_database
 from .. import selectors
+from ..cache import (
+    build_catalog_cache_key,
+    build_product_facets_cache_key,
+    build_product_list_cache_key,
+    bump_catalog_version,
+    get_catalog_cache_timeout,
+    get_catalog_last_modified,
+    get_catalog_version,
+    is_catalog_settling,
+    normalize_query_params,
+)
+from .fast_serializers import serialize_products
+from ..exporters import EXPORT_CONTENT_TYPES, export_products
+from ..filters import ProductFilter
 from ..models import ProductImage
-from ..services import ProductService
+from ..search import ProductSearchFilter
+from ..services import InventoryService, ProductService
 
 
-class ProductListCreateView(ListCreateAPIView):
-    queryset = selectors.get_all_products()
+class CatalogReplicaReadMixin(ReplicaReadMixin):
+    """
+    Replica reads for catalog views, whose responses are cached and validated under the catalog version.
+
+    Right after a version bump a lagging replica could still return the old
+    rows, which would then be cached and tagged with the new version until
+    it changes again. Reads stay on the primary until replicas caught up.
+    """
+
+    def can_read_from_replica(self, request) -> bool:
+        return not is_catalog_settling()
+
+
+class ProductListCreateView(ConditionalGetMixin, CatalogReplicaReadMixin, SparseFieldsetViewMixin, ListCreateAPIView):
+    queryset = selectors.get_product_list()
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['category', 'category__slug', 'is_active']
+    pagination_class = KeysetPagination
+    # Search runs after ordering so relevance ranking can replace the default order
+    filter_backends = [DjangoFilterBackend, OrderingFilter, ProductSearchFilter]
+    filterset_class = ProductFilter
     search_fields = ['name', 'description']
     ordering_fields = ['price', 'created_at', 'name']
     ordering = ['-created_at']
 
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return ProductListSerializer
+        return ProductSerializer
+
     def get_permissions(self):
         if self.request.method == 'POST':
             return [IsAdminUser()]
         return [AllowAny()]
 
+    def get_conditional_validators(self, request, *args, **kwargs):
+        return (build_product_list_cache_key(request),), get_catalog_last_modified()
+
+    def list(self, request, *args, **kwargs):
+        cache_key = build_product_list_cache_key(request)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        cache.set(cache_key, response.data, get_catalog_cache_timeout())
+        return response
+
     def perform_create(self, serializer):
         product_data = serializer.validated_data
         product = ProductService.create_product(product_data)
         serializer.instance = product
 
-class ProductDetailView(RetrieveUpdateDestroyAPIView):
+class ProductFacetsView(CatalogReplicaReadMixin, GenericAPIView):
+    queryset = selectors.get_product_list()
+    serializer_class = ProductFacetsSerializer
+    permission_classes = [AllowAny]
+    pagination_class = None
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter]
+    filterset_class = ProductFilter
+    search_fields = ProductListCreateView.search_fields
+
+    def get(self, request):
+        cache_key = build_product_facets_cache_key(request)
+        data = cache.get(cache_key)
+        if data is None:
+            products = self.filter_queryset(self.get_queryset())
+            facets = selectors.get_product_facets(products, settings.PRODUCT_FACET_PRICE_BOUNDS)
+            data = self.get_serializer(facets).data
+            cache.set(cache_key, data, get_catalog_cache_timeout())
+        return Response(data)
+
+
+class ProductExportView(CatalogReplicaReadMixin, APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        # Not `format`, which DRF reserves for renderer selection
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in EXPORT_CONTENT_TYPES:
+            return Response({"detail": "file_format must be ndjson or csv."}, status=400)
+
+        # The response streams after the request's routing state is gone, so pick the database now
+        rows = export_products(file_format, using=get_read_database())
+        response = StreamingHttpResponse(rows, content_type=EXPORT_CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="products.{file_format}"'
+        return response
+
+
+class ProductBulkUpdateView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def patch(self, request):
+        serializer = BulkProductUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        items, positions, errors = [], [], []
+        for index, item in enumerate(serializer.validated_data['items']):
+            item_serializer = BulkProductUpdateItemSerializer(data=item)
+            if item_serializer.is_valid():
+                items.append(item_serializer.validated_data)
+                positions.append(index)
+            else:
+                errors.append({'item': index, 'detail': item_serializer.errors})
+
+        result = InventoryService.bulk_update_products(items, serializer.validated_data['category_adjustments'])
+        for error in result['errors']:
+            if 'item' in error:
+                error['item'] = positions[error['item']]
+        errors.extend(result['errors'])
+        return Response({'updated': result['updated'], 'adjusted': result['adjusted'], 'errors': errors})
+
+
+class ProductSuggestView(CatalogReplicaReadMixin, APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if len(query) < settings.PRODUCT_SUGGEST_MIN_LENGTH:
+            return Response([])
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response({"detail": "limit must be a number."}, status=400)
+        limit = max(1, min(limit, settings.PRODUCT_SUGGEST_MAX_RESULTS))
+
+        cache_key = build_catalog_cache_key('suggest', f"{query.lower()}:{limit}")
+        suggestions = cache.get(cache_key)
+        if suggestions is None:
+            suggestions = selectors.get_product_suggestions(query, limit)
+            cache.set(cache_key, suggestions, get_catalog_cache_timeout())
+        return Response(ProductSuggestionSerializer(suggestions, many=True).data)
+
+
+class ProductDetailView(ConditionalGetMixin, CatalogReplicaReadMixin, SparseFieldsetViewMixin, RetrieveUpdateDestroyAPIView):
     queryset = selectors.get_all_products()
     serializer_class = ProductSerializer
+    fast_serializer = serialize_products
     lookup_field = 'slug'
 
     def get_permissions(self):
@@ -48,12 +192,23 @@ class ProductDetailView(RetrieveUpdateDestroyAPIView):
             return [IsAdminUser()]
         return [AllowAny()]
 
+    def get_conditional_validators(self, request, *args, **kwargs):
+        updated_at = selectors.get_product_updated_at(kwargs['slug'])
+        if updated_at is None:
+            return None, None
+        fieldset = normalize_query_params(request.query_params, ('fields', 'omit'))
+        etag_parts = (get_catalog_version(), kwargs['slug'], updated_at.isoformat(), fieldset)
+        return etag_parts, max(updated_at.timestamp(), get_catalog_last_modified())
+
     def perform_update(self, serializer):
         product_data = serializer.validated_data
         product_data['id'] = self.get_object().id
         product = ProductService.update_product(product_data)
         serializer.instance = product
 
+    def perform_destroy(self, instance):
+        ProductService.delete_product({'id': instance.id})
+
 
 class ProductImageUploadView(APIView):
     permission_classes = [IsAdminUser]
@@ -82,8 +237,19 @@ class ProductImageDetailView(RetrieveUpdateDestroyAPIView):
             return [IsAdminUser()]
         return [AllowAny()]
 
+    def perform_update(self, serializer):
+        previous_product_id = serializer.instance.product_id
+        image = serializer.save()
+        ProductService.refresh_primary_image(*{previous_product_id, image.product_id})
+        bump_catalog_version()
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        ProductService.refresh_primary_image(instance.product_id)
+        bump_catalog_version()
+
 
-class CategoryListCreateView(ListCreateAPIView):
+class CategoryListCreateView(CatalogReplicaReadMixin, ListCreateAPIView):
     queryset = selectors.get_all_categories()
     serializer_class = CategorySerializer
 
@@ -92,7 +258,26 @@ class CategoryListCreateView(ListCreateAPIView):
             return [IsAdminUser()]
         return [AllowAny()]
 
-class CategoryDetailView(RetrieveUpdateDestroyAPIView):
+    def perform_create(self, serializer):
+        serializer.save()
+        bump_catalog_version()
+
+
+class CategoryTreeView(CatalogReplicaReadMixin, GenericAPIView):
+    serializer_class = CategoryTreeSerializer
+    permission_classes = [AllowAny]
+    pagination_class = None
+
+    def get(self, request):
+        cache_key = build_catalog_cache_key('category-tree', '')
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.get_serializer(selectors.get_category_tree(), many=True).data
+            cache.set(cache_key, data, get_catalog_cache_timeout())
+        return Response(data)
+
+
+class CategoryDetailView(ConditionalGetMixin, CatalogReplicaReadMixin, RetrieveUpdateDestroyAPIView):
     queryset = selectors.get_all_categories()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
@@ -106,3 +291,28 @@ class CategoryDetailView(RetrieveUpdateDestroyAPIView):
         if self.request.method in ['PATCH', 'PUT', 'DELETE']:
             return [IsAdminUser()]
         return [AllowAny()]
+
+    def get_conditional_validators(self, request, *args, **kwargs):
+        updated_at = selectors.get_category_updated_at(kwargs['slug'])
+        if updated_at is None:
+            return None, None
+        page_query = normalize_query_params(request.query_params, ('cursor', 'page', 'page_size'))
+        etag_parts = (get_catalog_version(), kwargs['slug'], updated_at.isoformat(), page_query)
+        return etag_parts, max(updated_at.timestamp(), get_catalog_last_modified())
+
+    def retrieve(self, request, *args, **kwargs):
+        category = self.get_object()
+        products = selectors.get_category_products(category)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(products.order_by('-created_at'), request, view=self)
+        data = self.get_serializer(category).data
+        data['products'] = paginator.get_paginated_response(CategoryProductSerializer(page, many=True).data).data
+        return Response(data)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        bump_catalog_version()
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        bump_catalog_version()
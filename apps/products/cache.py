@@ -0,0 +1,133 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.cache import LookupCache
+
+CATALOG_VERSION_KEY = 'products:catalog_version'
+CATALOG_MODIFIED_KEY = 'products:catalog_modified'
+
+PRODUCT_LIST_CACHE_PARAMS = (
+    'category', 'category__slug', 'is_active', 'search', 'ordering', 'page', 'cursor', 'page_size',
+    'fields', 'omit',
+)
+
+# Facets ignore ordering and pagination, so those never split the cache
+PRODUCT_FACETS_CACHE_PARAMS = ('category', 'category__slug', 'is_active', 'search')
+
+# Category rows by 'id:<id>' and 'slug:<slug>', kept fresh by the signal handlers in signals.py
+category_lookup_cache = LookupCache(
+    'categories',
+    maxsize=settings.CATALOG_LOOKUP_CACHE_SIZE,
+    ttl=settings.CATALOG_LOOKUP_CACHE_TTL,
+    shared=settings.CATALOG_LOOKUP_CACHE_SHARED,
+)
+
+
+def get_catalog_version() -> int:
+    """
+    Get the current catalog version
+    Returns:
+        Integer version that changes every time the catalog is modified
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version number
+        cache.add(CATALOG_VERSION_KEY, int(time.time()), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version() -> int:
+    """
+    Invalidate every cached catalog response by moving to a new version
+    Returns:
+        The new catalog version
+    """
+    cache.set(CATALOG_MODIFIED_KEY, time.time(), timeout=None)
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        get_catalog_version()
+        return cache.incr(CATALOG_VERSION_KEY)
+
+
+def get_catalog_last_modified() -> float:
+    """
+    Get the time of the last catalog change
+    Returns:
+        Unix timestamp of the last version bump, or now if it is unknown
+    """
+    modified = cache.get(CATALOG_MODIFIED_KEY)
+    if modified is None:
+        modified = time.time()
+        cache.add(CATALOG_MODIFIED_KEY, modified, timeout=None)
+    return modified
+
+
+def is_catalog_settling() -> bool:
+    """
+    Check whether replicas may still lag behind the last catalog change
+    Returns:
+        True for DATABASE_REPLICA_PIN_SECONDS after a version bump
+    """
+    return time.time() - get_catalog_last_modified() < settings.DATABASE_REPLICA_PIN_SECONDS
+
+
+def normalize_query_params(query_params, allowed_params) -> str:
+    """
+    Build a canonical query string from the parameters that affect a response
+    Args:
+        query_params: QueryDict of request query parameters
+        allowed_params: Iterable of parameter names to keep
+    Returns:
+        Query string with sorted keys and values, ignoring unknown and empty parameters
+    """
+    parts = []
+    for name in sorted(allowed_params):
+        values = sorted(value for value in query_params.getlist(name) if value != '')
+        parts.extend(f"{name}={value}" for value in values)
+    return '&'.join(parts)
+
+
+def build_catalog_cache_key(namespace: str, raw_key: str) -> str:
+    """
+    Build a cache key scoped to the current catalog version
+    Args:
+        namespace: Short name of the cached resource, e.g. 'list'
+        raw_key: String identifying the cached variant
+    Returns:
+        Cache key that is invalidated whenever the catalog version changes
+    """
+    digest = hashlib.md5(raw_key.encode('utf-8')).hexdigest()
+    return f"products:{namespace}:v{get_catalog_version()}:{digest}"
+
+
+def build_product_list_cache_key(request) -> str:
+    """
+    Build the cache key for a product list response
+    Args:
+        request: DRF request for the product list
+    Returns:
+        Cache key scoped to the current catalog version
+    """
+    query = normalize_query_params(request.query_params, PRODUCT_LIST_CACHE_PARAMS)
+    # Pagination links are absolute, so responses differ per host
+    return build_catalog_cache_key('list', f"{request.get_host()}?{query}")
+
+
+def build_product_facets_cache_key(request) -> str:
+    """
+    Build the cache key for a product facets response
+    Args:
+        request: DRF request for the product facets
+    Returns:
+        Cache key scoped to the current catalog version
+    """
+    return build_catalog_cache_key('facets', normalize_query_params(request.query_params, PRODUCT_FACETS_CACHE_PARAMS))
+
+
+def get_catalog_cache_timeout() -> int:
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300)
@@ -0,0 +1,80 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import selectors
+
+EXPORT_FIELDS = [
+    'id', 'name', 'slug', 'description', 'price', 'stock_quantity', 'is_active',
+    'category_id', 'category_slug', 'category_name', 'primary_image_url', 'created_at', 'updated_at',
+]
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class _Echo:
+    """File-like object whose write() hands the written line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_export_rows(chunk_size: int = 2000, using: str = None):
+    """
+    Stream every product as a flat dict
+    Args:
+        chunk_size: Rows fetched from the database per round trip
+        using: Database alias to read from, routed as a normal read if omitted
+    Returns:
+        Generator of dicts keyed by EXPORT_FIELDS
+    """
+    return selectors.get_products_for_export().using(using).iterator(chunk_size=chunk_size)
+
+
+def iter_ndjson(rows):
+    """
+    Encode rows as JSON Lines
+    Args:
+        rows: Iterable of export dicts
+    Returns:
+        Generator of newline-terminated JSON strings
+    """
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def iter_csv(rows):
+    """
+    Encode rows as CSV with a header line
+    Args:
+        rows: Iterable of export dicts
+    Returns:
+        Generator of CSV lines
+    """
+    writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+EXPORT_ENCODERS = {
+    'ndjson': iter_ndjson,
+    'csv': iter_csv,
+}
+
+
+def export_products(file_format: str, chunk_size: int = 2000, using: str = None):
+    """
+    Stream the whole catalog in the requested format
+    Args:
+        file_format: 'ndjson' or 'csv'
+        chunk_size: Rows fetched from the database per round trip
+        using: Database alias to read from, routed as a normal read if omitted
+    Returns:
+        Generator of encoded lines
+    """
+    return EXPORT_ENCODERS[file_format](iter_export_rows(chunk_size, using))
@@ -0,0 +1,27 @@
+from django.db.models import Subquery
+from django_filters import rest_framework as filters
+
+from .models import Category, Product
+
+
+class ProductFilter(filters.FilterSet):
+    """
+    Product list filters.
+
+    `category` (ID) and `category__slug` match the category and all of its
+    descendants. The subtree is a single `category.path LIKE 'prefix%'`
+    condition on the joined category table, with the prefix read by a
+    subquery. A path from the per-process lookup cache could predate a move
+    and get the list cached under the new catalog version.
+    """
+    category = filters.NumberFilter(method='filter_category')
+    category__slug = filters.CharFilter(method='filter_category')
+
+    class Meta:
+        model = Product
+        fields = ['category', 'category__slug', 'is_active']
+
+    def filter_category(self, queryset, name, value):
+        lookup = {'id': int(value)} if name == 'category' else {'slug': value}
+        path = Category.objects.filter(**lookup).values('path')
+        return queryset.filter(category__path__startswith=Subquery(path))
@@ -0,0 +1,187 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.db import DatabaseError, transaction
+
+from . import selectors
+from .cache import bump_catalog_version
+from .models import validate_product_slug
+from .services import CategoryService, InventoryService, ProductService
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'f', 'no', 'n'}
+
+
+def read_csv_rows(stream):
+    """
+    Stream rows from a CSV file with a header line
+    Args:
+        stream: Text file object
+    Returns:
+        Generator of (line number, row dict) tuples
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl_rows(stream):
+    """
+    Stream rows from a JSON Lines file, one object per line
+    Args:
+        stream: Text file object
+    Returns:
+        Generator of (line number, row dict) tuples; undecodable lines yield the error message instead of a dict
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, f"Invalid JSON: {exc}"
+            continue
+        yield line_number, row if isinstance(row, dict) else "Expected a JSON object"
+
+
+class ProductImporter:
+    """
+    Load products from parsed rows in batched upserts.
+
+    Categories are resolved by slug from a map loaded once up front, rows are
+    validated in Python and every batch is written with one INSERT ... ON
+    CONFLICT statement. Invalid rows are collected with their line number
+    instead of aborting the import.
+    """
+
+    def __init__(self, batch_size: int = 1000, update_existing: bool = True, dry_run: bool = False):
+        self.batch_size = batch_size
+        self.update_existing = update_existing
+        self.dry_run = dry_run
+        self.category_ids = selectors.get_category_ids_by_slug()
+        self.touched_category_ids = set()
+        self.processed = 0
+        self.imported = 0
+        self.errors = []
+
+    def run(self, rows, progress=None) -> None:
+        """
+        Import every row
+        Args:
+            rows: Iterable of (line number, row dict or error message) tuples
+            progress: Optional callable invoked with the importer after each batch
+        """
+        batch = {}
+        for line_number, row in rows:
+            self.processed += 1
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError(row)
+                product_data = self.clean_row(row)
+            except ValueError as exc:
+                self.errors.append((line_number, str(exc)))
+                continue
+
+            # A slug repeated inside one batch would hit the same row twice in a single upsert
+            batch.pop(product_data['slug'], None)
+            batch[product_data['slug']] = (line_number, product_data)
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                batch = {}
+                if progress:
+                    progress(self)
+
+        if batch:
+            self.write_batch(batch)
+            if progress:
+                progress(self)
+
+        if self.touched_category_ids and not self.dry_run:
+            # Upserts may move existing products out of untouched categories, so refresh them all
+            category_ids = () if self.update_existing else self.touched_category_ids
+            CategoryService.refresh_product_counts(*category_ids)
+            bump_catalog_version()
+
+    def write_batch(self, batch: dict) -> None:
+        rows = list(batch.values())
+        if self.dry_run:
+            self.imported += len(rows)
+            return
+        try:
+            with transaction.atomic():
+                self.imported += ProductService.bulk_upsert_products(
+                    [product_data for _, product_data in rows], self.update_existing
+                )
+        except DatabaseError as exc:
+            first_line, last_line = rows[0][0], rows[-1][0]
+            self.errors.append((first_line, f"Batch ending at line {last_line} failed: {exc}"))
+            return
+        self.touched_category_ids.update(product_data['category_id'] for _, product_data in rows)
+
+    def clean_row(self, row: dict) -> dict:
+        """
+        Validate and convert a raw row
+        Args:
+            row: Dict of column name to raw value
+        Returns:
+            Dictionary containing name, slug, description, price, stock_quantity, is_active, category_id
+        Raises:
+            ValueError describing the first invalid column
+        """
+        name = str(row.get('name') or '').strip()
+        if not name or len(name) > 255:
+            raise ValueError("name is required and must be at most 255 characters")
+
+        slug = str(row.get('slug') or '').strip()
+        try:
+            validate_slug(slug)
+            validate_product_slug(slug)
+        except ValidationError:
+            raise ValueError(f"Invalid slug '{slug}'")
+        if len(slug) > 255:
+            raise ValueError("slug must be at most 255 characters")
+
+        category_slug = str(row.get('category') or '').strip()
+        category_id = self.category_ids.get(category_slug)
+        if category_id is None:
+            raise ValueError(f"Unknown category '{category_slug}'")
+
+        try:
+            price = Decimal(str(row.get('price'))).quantize(Decimal('0.01'))
+        except (InvalidOperation, ValueError):
+            raise ValueError(f"Invalid price '{row.get('price')}'")
+        if not price.is_finite() or price < 0 or price > InventoryService.get_price_limit():
+            raise ValueError(f"Invalid price '{row.get('price')}'")
+
+        try:
+            stock_quantity = int(str(row.get('stock_quantity')).strip())
+        except ValueError:
+            raise ValueError(f"Invalid stock_quantity '{row.get('stock_quantity')}'")
+        if stock_quantity < 0:
+            raise ValueError("stock_quantity cannot be negative")
+
+        return {
+            'name': name,
+            'slug': slug,
+            'description': str(row.get('description') or ''),
+            'price': price,
+            'stock_quantity': stock_quantity,
+            'is_active': self.clean_boolean(row.get('is_active')),
+            'category_id': category_id,
+        }
+
+    @staticmethod
+    def clean_boolean(value) -> bool:
+        if value is None or value == '':
+            return True
+        if isinstance(value, bool):
+            return value
+        normalized = str(value).strip().lower()
+        if normalized in TRUE_VALUES:
+            return True
+        if normalized in FALSE_VALUES:
+            return False
+        raise ValueError(f"Invalid is_active '{value}'")
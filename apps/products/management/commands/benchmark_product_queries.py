@@ -0,0 +1,100 @@
+import statistics
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.core.benchmarks import Rollback
+from ... import selectors
+from ...filters import ProductFilter
+from ...models import Category, Product
+from ...services import CategoryService
+
+ORDERINGS = ['-created_at', 'price', '-price', 'name']
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed products and print EXPLAIN plans and timings for every product list filter/order combination. "
+        "Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=10000, help="Number of products to seed")
+        parser.add_argument('--categories', type=int, default=20, help="Number of categories to spread them over")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per query")
+        parser.add_argument('--page-size', type=int, default=10)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        categories = self.seed(options['products'], options['categories'])
+        category = categories[0]
+        # Query parameters as the list endpoint receives them
+        filters = {
+            'none': {},
+            'is_active': {'is_active': 'true'},
+            'category': {'category': str(category.id)},
+            'category__slug': {'category__slug': category.slug},
+            'is_active+category': {'is_active': 'true', 'category': str(category.id)},
+        }
+        for filter_name, params in filters.items():
+            for ordering in ORDERINGS:
+                self.benchmark(filter_name, params, ordering, options['repeat'], options['page_size'])
+
+    def seed(self, product_count, category_count):
+        self.stdout.write(f"Seeding {product_count} products in {category_count} categories...")
+        # Unique per run so seeding never collides with catalog rows
+        prefix = f'bench-{uuid.uuid4().hex[:8]}-'
+        categories = [
+            Category.objects.create(name=f'Benchmark category {index}', slug=f'{prefix}category-{index}')
+            for index in range(category_count)
+        ]
+        batch = []
+        for index in range(product_count):
+            batch.append(Product(
+                name=f'Benchmark product {index}',
+                slug=f'{prefix}product-{index}',
+                description='Seeded by benchmark_product_queries',
+                price=Decimal(index % 1000) + Decimal('0.99'),
+                stock_quantity=index % 50,
+                is_active=index % 10 != 0,
+                category=categories[index % category_count],
+            ))
+            if len(batch) == 1000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+        CategoryService.refresh_product_counts(*(category.id for category in categories))
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE products_product')
+        return categories
+
+    def benchmark(self, filter_name, params, ordering, repeat, page_size):
+        # Same shape as ProductListCreateView with keyset pagination: ProductFilter, order, pk tie-breaker, LIMIT
+        tie_breaker = '-id' if ordering.startswith('-') else 'id'
+        queryset = ProductFilter(params, queryset=selectors.get_all_products()).qs.order_by(ordering, tie_breaker)
+        page = queryset.prefetch_related(None)[:page_size + 1]
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            # A fresh clone per run, evaluating `page` itself would time its result cache
+            list(page.all())
+            timings.append((time.perf_counter() - started) * 1000)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{filter_name} ordered by {ordering}"))
+        self.stdout.write(page.explain())
+        self.stdout.write(
+            f"median {statistics.median(timings):.2f} ms, min {min(timings):.2f} ms over {repeat} runs"
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ...exporters import EXPORT_CONTENT_TYPES, export_products
+
+
+class Command(BaseCommand):
+    help = "Stream every product with its category and primary image as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_CONTENT_TYPES, default='ndjson', help="Output format")
+        parser.add_argument('--output', help="File to write, stdout by default")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows fetched from the database per round trip")
+
+    def handle(self, *args, **options):
+        lines = export_products(options['format'], options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        count = -1 if options['format'] == 'csv' else 0
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            for line in lines:
+                output.write(line)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} products to {options['output']}"))
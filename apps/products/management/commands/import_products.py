@@ -0,0 +1,74 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importers import ProductImporter, read_csv_rows, read_jsonl_rows
+
+READERS = {
+    'csv': read_csv_rows,
+    'jsonl': read_jsonl_rows,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import products from a CSV or JSON Lines file. Columns: name, slug, description, price, "
+        "stock_quantity, is_active, category (category slug). Existing products are matched by slug."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import")
+        parser.add_argument('--format', choices=READERS, help="File format, detected from the extension by default")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows written per INSERT statement")
+        parser.add_argument('--skip-existing', action='store_true', help="Leave products whose slug already exists untouched")
+        parser.add_argument('--dry-run', action='store_true', help="Validate the file without writing anything")
+        parser.add_argument('--errors-file', help="Write every rejected row to this CSV file")
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or self.detect_format(options['path'])
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        importer = ProductImporter(
+            batch_size=options['batch_size'],
+            update_existing=not options['skip_existing'],
+            dry_run=options['dry_run'],
+        )
+        self.started = time.monotonic()
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as stream:
+                importer.run(READERS[file_format](stream), progress=self.report_progress)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+
+        if options['errors_file'] and importer.errors:
+            with open(options['errors_file'], 'w', newline='', encoding='utf-8') as errors_file:
+                writer = csv.writer(errors_file)
+                writer.writerow(['line', 'error'])
+                writer.writerows(importer.errors)
+
+        for line_number, message in importer.errors[:20]:
+            self.stderr.write(f"line {line_number}: {message}")
+        if len(importer.errors) > 20:
+            self.stderr.write(f"... and {len(importer.errors) - 20} more errors")
+
+        verb = "Validated" if options['dry_run'] else "Imported"
+        summary = f"{verb} {importer.imported} of {importer.processed} rows with {len(importer.errors)} errors"
+        self.stdout.write(self.style.SUCCESS(summary) if not importer.errors else self.style.WARNING(summary))
+
+    def detect_format(self, path):
+        extension = path.rsplit('.', 1)[-1].lower()
+        if extension in ('jsonl', 'ndjson'):
+            return 'jsonl'
+        if extension == 'csv':
+            return 'csv'
+        raise CommandError("Cannot detect the file format, pass --format")
+
+    def report_progress(self, importer):
+        elapsed = time.monotonic() - self.started
+        rate = importer.processed / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{importer.processed} rows processed, {importer.imported} imported, "
+            f"{len(importer.errors)} errors ({rate:.0f} rows/s)"
+        )
@@ -0,0 +1,45 @@
+# Generated by Django 6.0.2 on 2026-10-17 03:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX product_name_trgm_idx ON products_product '
+            'USING gin (name gin_trgm_ops) WHERE is_active'
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS product_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_search_vector'),
+    ]
+
+    operations = [
+        # pg_trgm and the GIN index only exist on PostgreSQL
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_trigram_index, drop_trigram_index),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='product',
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        condition=models.Q(is_active=True),
+                        fields=['name'],
+                        name='product_name_trgm_idx',
+                        opclasses=['gin_trgm_ops'],
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-17 02:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_product_counts(apps, schema_editor):
+    Category = apps.get_model('products', 'Category')
+    Product = apps.get_model('products', 'Product')
+    counts = Product.objects.filter(category=OuterRef('pk')).order_by().values('category').annotate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(is_active=True)),
+    )
+    Category.objects.update(
+        product_count=Coalesce(Subquery(counts.values('total')), 0),
+        active_product_count=Coalesce(Subquery(counts.values('active')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_name_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='active_product_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='product_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'created_at', 'id'], name='products_pr_categor_67fdd1_idx'),
+        ),
+        migrations.RunPython(backfill_product_counts, migrations.RunPython.noop),
+    ]
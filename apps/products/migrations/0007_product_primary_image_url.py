@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-17 02:16
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_primary_image_url(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+    primary_image = ProductImage.objects.filter(product=OuterRef('pk')).order_by('-is_primary', 'id')
+    Product.objects.update(primary_image_url=Coalesce(Subquery(primary_image.values('image_url')[:1]), Value('')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_browse_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image_url',
+            field=models.URLField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.RunPython(backfill_primary_image_url, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat, LPad
+
+
+def backfill_category_paths(apps, schema_editor):
+    # Existing categories are all roots, so each path is just the category's own padded ID
+    Category = apps.get_model('products', 'Category')
+    Category.objects.update(path=Concat(LPad(Cast('id', CharField()), 10, Value('0')), Value('/')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_primary_image_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='products.category'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_category_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['path'], name='category_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-17 12:00
+
+import apps.products.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_category_tree'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='slug',
+            field=models.SlugField(max_length=255, unique=True, validators=[apps.products.models.validate_product_slug]),
+        ),
+    ]
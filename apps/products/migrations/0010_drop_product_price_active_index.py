@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-17 12:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_reserved_slugs'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_price_active_idx',
+        ),
+    ]
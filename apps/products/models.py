@@ -1,26 +1,115 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+
+# Width of one zero-padded ID in a category path, so paths sort and prefix-match as strings
+CATEGORY_PATH_STEP = 10
+
+# Fixed routes next to '<slug:slug>/' in api/urls.py, a product with one of these slugs could not be reached
+RESERVED_PRODUCT_SLUGS = frozenset({'categories', 'facets', 'export', 'bulk', 'suggest'})
+
+
+def validate_product_slug(value):
+    if value in RESERVED_PRODUCT_SLUGS:
+        raise ValidationError(f"'{value}' is reserved and cannot be used as a product slug.")
 
 
 class Category(models.Model):
     name = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True)
+    parent = models.ForeignKey('self', related_name='children', null=True, blank=True, on_delete=models.CASCADE)
+    # Materialized path of zero-padded ancestor IDs ending with this category's own ID, e.g.
+    # '0000000001/0000000004/'. Descendants are every row whose path starts with this one.
+    path = models.CharField(max_length=255, default='', editable=False)
+    # Denormalized counters, kept in sync by CategoryService.refresh_product_counts
+    product_count = models.PositiveIntegerField(default=0, editable=False)
+    active_product_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Pattern ops let PostgreSQL answer `path LIKE 'prefix%'` with an index range scan
+            models.Index(fields=['path'], name='category_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
     def __str__(self):
         return self.name
 
+    def clean(self):
+        if self.pk is not None and self.parent_id is not None and self.parent.path.startswith(self.path):
+            raise ValidationError({'parent': "A category cannot be moved under itself or one of its descendants."})
+
+    def save(self, *args, **kwargs):
+        """
+        Save the category and keep the materialized paths of it and its subtree in sync
+        Raises:
+            ValueError if the parent is the category itself or one of its descendants
+        """
+        parent_path = ''
+        if self.parent_id is not None:
+            parent_path = Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).get()
+
+        with transaction.atomic(using=kwargs.get('using')):
+            if self.pk is None:
+                super().save(*args, **kwargs)
+                self.path = f"{parent_path}{self.pk:0{CATEGORY_PATH_STEP}d}/"
+                Category.objects.filter(pk=self.pk).update(path=self.path)
+                return
+
+            previous_path = Category.objects.filter(pk=self.pk).values_list('path', flat=True).first()
+            if previous_path and parent_path.startswith(previous_path):
+                raise ValueError("A category cannot be moved under itself or one of its descendants")
+
+            self.path = f"{parent_path}{self.pk:0{CATEGORY_PATH_STEP}d}/"
+            if previous_path and previous_path != self.path:
+                # Re-root the whole subtree in one UPDATE by swapping the path prefix
+                Category.objects.filter(path__startswith=previous_path).exclude(pk=self.pk).update(
+                    path=Concat(Value(self.path), Substr('path', len(previous_path) + 1)),
+                )
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'path'}
+            super().save(*args, **kwargs)
+
 
 class Product(models.Model):
     name = models.CharField(max_length=255)
-    slug = models.SlugField(max_length=255, unique=True)
+    slug = models.SlugField(max_length=255, unique=True, validators=[validate_product_slug])
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock_quantity = models.PositiveIntegerField()
     is_active = models.BooleanField(default=True)
     category = models.ForeignKey(Category, related_name='products', on_delete=models.CASCADE)
+    # Denormalized thumbnail for list views, kept in sync by ProductService.refresh_primary_image
+    primary_image_url = models.URLField(max_length=500, blank=True, default='', editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger on PostgreSQL, see migration 0003
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['price', 'id']),
+            models.Index(fields=['category', 'created_at', 'id']),
+            # Storefront browse shapes: filters on is_active / category, ordered by created_at, price or name
+            models.Index(fields=['is_active', 'category', 'created_at', 'id'], name='product_active_cat_created_idx'),
+            models.Index(
+                fields=['category', 'price', 'id'], name='product_cat_price_active_idx', condition=models.Q(is_active=True)
+            ),
+            models.Index(fields=['name', 'id'], name='product_name_active_idx', condition=models.Q(is_active=True)),
+            GinIndex(fields=['search_vector'], name='product_search_vector_idx'),
+            GinIndex(
+                fields=['name'],
+                name='product_name_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,37 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+# Must match the text search configuration used by the trigger in migration 0003
+SEARCH_CONFIG = 'english'
+
+
+class ProductSearchFilter(SearchFilter):
+    """
+    Full-text product search backed by the GIN-indexed `search_vector` column.
+
+    On PostgreSQL the `search` parameter is parsed as a web search query and
+    results are ranked by relevance unless the client passes an explicit
+    ordering. Other database engines fall back to `SearchFilter`, which matches
+    the view's `search_fields` with ILIKE.
+    """
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        search = request.query_params.get(self.search_param, '').strip()
+        if not search:
+            return queryset
+
+        query = SearchQuery(search, config=SEARCH_CONFIG, search_type='websearch')
+        # ts_rank returns a real; as a double the cursor value compares equal to the row again on the next page
+        rank = Cast(SearchRank(F('search_vector'), query), FloatField())
+        queryset = queryset.filter(search_vector=query).annotate(rank=rank)
+        if self.ordering_param not in request.query_params:
+            queryset = queryset.order_by('-rank')
+        return queryset
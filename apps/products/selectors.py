@@ -1,3 +1,8 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+
+from .cache import category_lookup_cache
 from .models import Category, Product, ProductImage
 
 
@@ -12,39 +17,121 @@ def get_all_categories():
 
 def get_category_by_slug(slug: str) -> Category:
     """
-    Get category by slug
+    Get category by slug, served from the in-process lookup cache
     Args:
         slug: Category slug
     Returns:
         Category instance or None if not found
     """
+    def load():
+        try:
+            return Category.objects.get(slug=slug)
+        except Category.DoesNotExist:
+            return None
+
+    return category_lookup_cache.get_or_load(f'slug:{slug}', load)
+
+
+def get_category_ids_by_slug() -> dict:
+    """
+    Get a map of every category slug to its ID
+    Returns:
+        Dict of slug -> category ID, loaded in a single query
+    """
+    return dict(Category.objects.values_list('slug', 'id'))
+
+
+def get_category_tree() -> list:
+    """
+    Build the whole category tree from a single query
+    Returns:
+        List of root category dicts, each with its nested 'children', siblings in path (creation) order
+    """
+    nodes, roots = {}, []
+    rows = Category.objects.order_by('path').values(
+        'id', 'parent_id', 'name', 'slug', 'product_count', 'active_product_count'
+    )
+    # Path order puts every parent before its descendants
+    for row in rows:
+        parent_id = row.pop('parent_id')
+        node = nodes[row['id']] = {**row, 'children': []}
+        (nodes[parent_id]['children'] if parent_id is not None else roots).append(node)
+    return roots
+
+
+def get_category_updated_at(slug: str):
+    """
+    Get the last modification time of a category without loading it
+    Args:
+        slug: Category slug
+    Returns:
+        datetime of the last update or None if not found
+    """
     try:
-        return Category.objects.get(slug=slug)
+        return Category.objects.values_list('updated_at', flat=True).get(slug=slug)
     except Category.DoesNotExist:
         return None
 
 
 def get_category_by_id(category_id: int) -> Category:
     """
-    Get category by ID
+    Get category by ID, served from the in-process lookup cache
     Args:
         category_id: Category ID
     Returns:
         Category instance or None if not found
     """
-    try:
-        return Category.objects.get(id=category_id)
-    except Category.DoesNotExist:
-        return None
+    def load():
+        try:
+            return Category.objects.get(id=category_id)
+        except Category.DoesNotExist:
+            return None
+
+    return category_lookup_cache.get_or_load(f'id:{category_id}', load)
+
+
+def get_category_descendants(category: Category):
+    """
+    Get a category and all of its descendants
+    Args:
+        category: Category instance
+    Returns:
+        QuerySet of the categories whose materialized path starts with the category's path
+    """
+    return Category.objects.filter(path__startswith=category.path)
 
 
 def get_all_products():
     """
-    Get all products
+    Get all products with their category and images
+    Returns:
+        QuerySet of all Product instances with category joined, images prefetched and the search vector deferred
+    """
+    return Product.objects.select_related('category').prefetch_related('images').defer('search_vector')
+
+
+def get_product_list():
+    """
+    Get products for list views
+    Returns:
+        QuerySet of Product instances with category joined, without images and the long text columns
+    """
+    return Product.objects.select_related('category').defer('description', 'search_vector')
+
+
+def get_products_for_export():
+    """
+    Get every product flattened with its category and primary image for a catalog export
     Returns:
-        QuerySet of all Product instances
+        QuerySet of dicts ordered by ID, meant to be consumed with iterator()
     """
-    return Product.objects.all()
+    return Product.objects.order_by('id').annotate(
+        category_slug=F('category__slug'),
+        category_name=F('category__name'),
+    ).values(
+        'id', 'name', 'slug', 'description', 'price', 'stock_quantity', 'is_active',
+        'category_id', 'category_slug', 'category_name', 'primary_image_url', 'created_at', 'updated_at',
+    )
 
 
 def get_product_by_slug(slug: str) -> Product:
@@ -61,6 +148,85 @@ def get_product_by_slug(slug: str) -> Product:
         return None
 
 
+def get_product_suggestions(query: str, limit: int = 10) -> list:
+    """
+    Get active product names matching a prefix or a misspelled query
+    Args:
+        query: Text typed by the user
+        limit: Maximum number of suggestions
+    Returns:
+        List of dicts with name and slug, best matches first
+    """
+    products = Product.objects.filter(is_active=True)
+    if connections[products.db].vendor == 'postgresql':
+        # Served by the pg_trgm GIN index on name, see migration 0004
+        products = products.filter(name__trigram_word_similar=query).annotate(
+            similarity=TrigramWordSimilarity(query, 'name')
+        ).order_by('-similarity', 'name')
+    else:
+        products = products.filter(name__icontains=query).annotate(
+            similarity=Case(When(name__istartswith=query, then=Value(0)), default=Value(1), output_field=IntegerField())
+        ).order_by('similarity', 'name')
+    return list(products.values('name', 'slug')[:limit])
+
+
+def get_product_facets(products, price_bounds) -> dict:
+    """
+    Compute the storefront sidebar facets for a filtered product queryset
+    Args:
+        products: Product QuerySet with the list filters already applied
+        price_bounds: Ascending lower bounds of the price buckets, the last bucket is open-ended
+    Returns:
+        Dict with the total, in-stock count, per-category counts and price bucket counts
+    """
+    buckets = []
+    for index, lower in enumerate(price_bounds):
+        upper = price_bounds[index + 1] if index + 1 < len(price_bounds) else None
+        condition = Q(price__gte=lower) if upper is None else Q(price__gte=lower, price__lt=upper)
+        buckets.append({'min': lower, 'max': upper, 'condition': condition})
+
+    # One grouped query: per-category rows carry every other facet as conditional counts
+    aggregates = {'count': Count('id'), 'in_stock': Count('id', filter=Q(stock_quantity__gt=0))}
+    for index, bucket in enumerate(buckets):
+        aggregates[f'price_{index}'] = Count('id', filter=bucket['condition'])
+    rows = products.order_by().values('category_id', 'category__name', 'category__slug').annotate(**aggregates)
+
+    facets = {'total': 0, 'in_stock': 0, 'categories': [], 'price_buckets': []}
+    bucket_counts = [0] * len(buckets)
+    for row in rows:
+        facets['total'] += row['count']
+        facets['in_stock'] += row['in_stock']
+        facets['categories'].append({
+            'id': row['category_id'],
+            'name': row['category__name'],
+            'slug': row['category__slug'],
+            'count': row['count'],
+        })
+        for index in range(len(buckets)):
+            bucket_counts[index] += row[f'price_{index}']
+
+    facets['categories'].sort(key=lambda category: (-category['count'], category['name']))
+    facets['price_buckets'] = [
+        {'min': bucket['min'], 'max': bucket['max'], 'count': count}
+        for bucket, count in zip(buckets, bucket_counts)
+    ]
+    return facets
+
+
+def get_product_updated_at(slug: str):
+    """
+    Get the last modification time of a product without loading it
+    Args:
+        slug: Product slug
+    Returns:
+        datetime of the last update or None if not found
+    """
+    try:
+        return Product.objects.values_list('updated_at', flat=True).get(slug=slug)
+    except Product.DoesNotExist:
+        return None
+
+
 def get_product_images(product: Product):
     """
     Get all images for a product
@@ -92,6 +258,17 @@ def get_products_by_category(category: Category):
     return Product.objects.filter(category=category)
 
 
+def get_category_products(category: Category):
+    """
+    Get the products embedded in a category detail page
+    Args:
+        category: Category instance
+    Returns:
+        QuerySet of Product instances limited to the columns shown in the category listing
+    """
+    return Product.objects.filter(category=category).only('id', 'name', 'slug', 'price', 'created_at')
+
+
 def get_image_by_id(image_id: int) -> ProductImage:
     """
     Get product image by ID
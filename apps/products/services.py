@@ -1,5 +1,35 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Round
+from django.utils import timezone
+
 from . import selectors
-from .models import Product
+from .cache import bump_catalog_version
+from .models import Category, Product, ProductImage
+
+
+class CategoryService:
+
+    @staticmethod
+    def refresh_product_counts(*category_ids: int) -> None:
+        """
+        Recompute the denormalized product counters of categories in a single UPDATE
+        Args:
+            category_ids: IDs of the categories to refresh, all categories if omitted
+        """
+        counts = Product.objects.filter(category=OuterRef('pk')).order_by().values('category').annotate(
+            total=Count('pk'),
+            active=Count('pk', filter=Q(is_active=True)),
+        )
+        categories = Category.objects.all()
+        if category_ids:
+            categories = categories.filter(id__in=category_ids)
+        categories.update(
+            product_count=Coalesce(Subquery(counts.values('total')), 0),
+            active_product_count=Coalesce(Subquery(counts.values('active')), 0),
+        )
 
 
 class ProductService:
@@ -29,6 +59,8 @@ class ProductService:
             is_active=product_data.get('is_active', True),
             category=category
         )
+        CategoryService.refresh_product_counts(category.id)
+        bump_catalog_version()
         return product
 
     @staticmethod
@@ -48,6 +80,8 @@ class ProductService:
         except Product.DoesNotExist:
             raise ValueError("Product does not exist")
 
+        previous_category_id = product.category_id
+        previous_is_active = product.is_active
         if 'category_id' in product_data:
             category_id = product_data.get('category_id')
             category = selectors.get_category_by_id(category_id)
@@ -63,6 +97,9 @@ class ProductService:
         product.is_active = product_data.get('is_active', product.is_active)
 
         product.save()
+        if product.category_id != previous_category_id or product.is_active != previous_is_active:
+            CategoryService.refresh_product_counts(previous_category_id, product.category_id)
+        bump_catalog_version()
         return product
 
     @staticmethod
@@ -83,8 +120,40 @@ class ProductService:
             raise ValueError("Product does not exist")
 
         product.delete()
+        CategoryService.refresh_product_counts(product.category_id)
+        bump_catalog_version()
         return product
 
+    @staticmethod
+    def bulk_upsert_products(products_data: list, update_existing: bool = True) -> int:
+        """
+        Insert a batch of products in a single statement, matching existing rows by slug
+        Args:
+            products_data: List of dictionaries containing name, slug, description, price, stock_quantity,
+                is_active, category_id
+            update_existing: Overwrite products whose slug already exists instead of leaving them untouched
+        Returns:
+            Number of rows written; without update_existing only newly inserted rows count
+        Note:
+            Category counters and the catalog version are not refreshed, callers do it once per import
+        """
+        products = [Product(**product_data) for product_data in products_data]
+        if update_existing:
+            Product.objects.bulk_create(
+                products,
+                update_conflicts=True,
+                unique_fields=['slug'],
+                update_fields=['name', 'description', 'price', 'stock_quantity', 'is_active', 'category', 'updated_at'],
+            )
+            return len(products)
+
+        # Rows skipped on a slug conflict are not reported by the database, count the slugs that appear
+        slugs = [product.slug for product in products]
+        existing = Product.objects.filter(slug__in=slugs).count()
+        Product.objects.bulk_create(products, ignore_conflicts=True)
+        return Product.objects.filter(slug__in=slugs).count() - existing
+
+    @staticmethod
     def add_image_to_product(product: Product, image_url: str) -> Product:
         """
         Add an image to a product
@@ -95,9 +164,29 @@ class ProductService:
             Updated Product instance with the new image
         """
         product.images.create(image_url=image_url)
+        ProductService.refresh_primary_image(product.id)
+        product.refresh_from_db(fields=['primary_image_url'])
+        bump_catalog_version()
         return product
 
+    @staticmethod
+    def refresh_primary_image(*product_ids: int) -> None:
+        """
+        Recompute the denormalized primary image URL of products in a single UPDATE
+        Args:
+            product_ids: IDs of the products to refresh, all products if omitted
+        Note:
+            The image flagged is_primary wins, otherwise the oldest image; products without images get ''
+        """
+        primary_image = ProductImage.objects.filter(product=OuterRef('pk')).order_by('-is_primary', 'id')
+        products = Product.objects.all()
+        if product_ids:
+            products = products.filter(id__in=product_ids)
+        products.update(primary_image_url=Coalesce(Subquery(primary_image.values('image_url')[:1]), Value('')))
+
 class InventoryService:
+    BULK_UPDATE_FIELDS = ('price', 'stock_quantity', 'is_active')
+    BULK_UPDATE_BATCH_SIZE = 500
 
     @staticmethod
     def check_stock(product: Product, quantity: int) -> bool:
@@ -128,8 +217,23 @@ class InventoryService:
 
         product.stock_quantity -= quantity
         product.save()
+        transaction.on_commit(bump_catalog_version)
         return product
 
+    @staticmethod
+    def adjust_stock(product_id: int, quantity: int) -> None:
+        """
+        Move a product's stock by a quantity in one UPDATE, touching updated_at so validators change
+        Args:
+            product_id: ID of the product
+            quantity: Units to add, negative to remove
+        """
+        Product.objects.filter(id=product_id).update(
+            stock_quantity=F('stock_quantity') + quantity, updated_at=timezone.now()
+        )
+        # Cached lists and facets show stock; bumping before commit could re-cache the old rows
+        transaction.on_commit(bump_catalog_version)
+
     @staticmethod
     def increase_stock(product: Product, quantity: int) -> Product:
         """
@@ -142,4 +246,139 @@ class InventoryService:
         """
         product.stock_quantity += quantity
         product.save()
+        transaction.on_commit(bump_catalog_version)
         return product
+
+    @staticmethod
+    @transaction.atomic
+    def bulk_update_products(items: list, category_adjustments: list = ()) -> dict:
+        """
+        Apply price, stock and availability changes to many products with set-based UPDATEs
+        Args:
+            items: List of dictionaries containing id or slug and any of price, stock_quantity, is_active
+            category_adjustments: List of dictionaries containing category_id and either percentage or amount,
+                applied to every product price in the category before the item updates
+        Returns:
+            Dictionary with updated and adjusted row counts and a list of errors, each referring to the
+            position of the failing item or adjustment
+        """
+        errors = []
+        affected_category_ids = set()
+
+        adjusted = 0
+        adjusted_category_ids = [adjustment['category_id'] for adjustment in category_adjustments]
+        known_category_ids = set(Category.objects.filter(id__in=adjusted_category_ids).values_list('id', flat=True))
+        # Adjustments preserve price order, so checking each category's highest price catches any overflow
+        highest_prices = dict(
+            Product.objects.filter(category_id__in=known_category_ids).order_by().values('category_id').annotate(
+                highest=Max('price')
+            ).values_list('category_id', 'highest')
+        )
+        price_limit = InventoryService.get_price_limit()
+        for index, adjustment in enumerate(category_adjustments):
+            if adjustment['category_id'] not in known_category_ids:
+                errors.append({'category_adjustment': index, 'detail': "Category does not exist"})
+                continue
+            highest = highest_prices.get(adjustment['category_id'])
+            if highest is not None:
+                highest = InventoryService.get_adjusted_price(
+                    highest, adjustment.get('percentage'), adjustment.get('amount')
+                )
+                if highest > price_limit:
+                    errors.append({
+                        'category_adjustment': index, 'detail': f"Adjusted prices would exceed {price_limit}",
+                    })
+                    continue
+                highest_prices[adjustment['category_id']] = highest
+            adjusted += InventoryService.adjust_category_prices(
+                adjustment['category_id'], adjustment.get('percentage'), adjustment.get('amount')
+            )
+
+        # Resolve every id and slug in one query
+        ids = [item['id'] for item in items if 'id' in item]
+        slugs = [item['slug'] for item in items if 'id' not in item]
+        products = Product.objects.filter(Q(id__in=ids) | Q(slug__in=slugs)).values_list('id', 'slug', 'category_id')
+        by_id = {product_id: (product_id, category_id) for product_id, _, category_id in products}
+        by_slug = {slug: by_id[product_id] for product_id, slug, _ in products}
+
+        changes = {}
+        for index, item in enumerate(items):
+            product = by_id.get(item['id']) if 'id' in item else by_slug.get(item['slug'])
+            if product is None:
+                errors.append({'item': index, 'detail': "Product does not exist"})
+                continue
+            product_id, category_id = product
+            if product_id in changes:
+                errors.append({'item': index, 'detail': "Product is listed more than once"})
+                continue
+            changes[product_id] = {field: item[field] for field in InventoryService.BULK_UPDATE_FIELDS if field in item}
+            if 'is_active' in item:
+                affected_category_ids.add(category_id)
+
+        updated = 0
+        product_ids = list(changes)
+        now = timezone.now()
+        for start in range(0, len(product_ids), InventoryService.BULK_UPDATE_BATCH_SIZE):
+            batch = product_ids[start:start + InventoryService.BULK_UPDATE_BATCH_SIZE]
+            values = {}
+            for field_name in InventoryService.BULK_UPDATE_FIELDS:
+                field = Product._meta.get_field(field_name)
+                whens = [
+                    When(id=product_id, then=Value(changes[product_id][field_name], output_field=field))
+                    for product_id in batch if field_name in changes[product_id]
+                ]
+                if whens:
+                    # Rows that do not set this column keep their current value
+                    values[field_name] = Case(*whens, default=F(field_name), output_field=field)
+            updated += Product.objects.filter(id__in=batch).update(updated_at=now, **values)
+
+        if affected_category_ids:
+            CategoryService.refresh_product_counts(*affected_category_ids)
+        if updated or adjusted:
+            bump_catalog_version()
+        return {'updated': updated, 'adjusted': adjusted, 'errors': errors}
+
+    @staticmethod
+    def get_price_limit() -> Decimal:
+        """Highest price the price column can store"""
+        field = Product._meta.get_field('price')
+        return Decimal(10) ** (field.max_digits - field.decimal_places) - Decimal(10) ** -field.decimal_places
+
+    @staticmethod
+    def get_adjusted_price(price: Decimal, percentage: Decimal = None, amount: Decimal = None) -> Decimal:
+        """
+        Compute in Python what adjust_category_prices stores for one price
+        Returns:
+            Adjusted price, never below zero
+        """
+        if percentage is not None:
+            new_price = (price * (1 + Decimal(percentage) / 100)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        else:
+            new_price = price + Decimal(amount)
+        return max(new_price, Decimal('0.00'))
+
+    @staticmethod
+    def adjust_category_prices(category_id: int, percentage: Decimal = None, amount: Decimal = None) -> int:
+        """
+        Shift every product price in a category with a single UPDATE, never going below zero
+        Args:
+            category_id: Category ID
+            percentage: Relative change, e.g. -10 for a 10% discount
+            amount: Absolute change added to each price
+        Returns:
+            Number of products repriced
+        Raises:
+            ValueError if neither or both of percentage and amount are given
+        """
+        if (percentage is None) == (amount is None):
+            raise ValueError("Provide either percentage or amount")
+
+        if percentage is not None:
+            new_price = Round(F('price') * Value(1 + Decimal(percentage) / 100), 2)
+        else:
+            new_price = F('price') + Value(Decimal(amount))
+        price_field = Product._meta.get_field('price')
+        return Product.objects.filter(category_id=category_id).update(
+            price=Greatest(new_price, Value(Decimal('0.00')), output_field=price_field),
+            updated_at=timezone.now(),
+        )
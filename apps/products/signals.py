@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import selectors
+from .cache import category_lookup_cache
+from .models import Category
+
+
+@receiver(pre_save, sender=Category)
+def remember_previous_category_location(sender, instance, **kwargs):
+    """Keep the stored slug and path so renames and moves also drop entries cached under the old values"""
+    instance._previous_slug, instance._previous_path = None, None
+    if instance.pk is not None:
+        previous = Category.objects.filter(pk=instance.pk).values_list('slug', 'path').first()
+        if previous is not None:
+            instance._previous_slug, instance._previous_path = previous
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_lookups(sender, instance, **kwargs):
+    keys = [f'id:{instance.pk}', f'slug:{instance.slug}']
+    previous_slug = getattr(instance, '_previous_slug', None)
+    if previous_slug and previous_slug != instance.slug:
+        keys.append(f'slug:{previous_slug}')
+    previous_path = getattr(instance, '_previous_path', None)
+    if previous_path and previous_path != instance.path:
+        # A move rewrote the paths of the whole subtree with a queryset update
+        for category_id, slug in selectors.get_category_descendants(instance).values_list('id', 'slug'):
+            keys.extend([f'id:{category_id}', f'slug:{slug}'])
+    category_lookup_cache.invalidate(*keys)
@@ -1,3 +1,1038 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIClient
+
+from . import selectors
+from .api.serializers import ProductSerializer
+from .cache import category_lookup_cache, get_catalog_version
+from .models import Category, Product, ProductImage
+from .services import CategoryService, InventoryService, ProductService
+from ..accounts.models import CustomUser
+from ..core.cache import LookupCache
+from ..core.parsers import ORJSONParser
+from ..core.renderers import ORJSONRenderer
+
+
+class ProductListCacheTest(APITestCase):
+    """Test the versioned product list cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.list_url = reverse('product-list-create')
+        self.category = Category.objects.create(name='Phones', slug='phones')
+        self.product = ProductService.create_product({
+            'name': 'Phone',
+            'slug': 'phone',
+            'description': 'A phone',
+            'price': Decimal('199.99'),
+            'stock_quantity': 5,
+            'category_id': self.category.id,
+        })
+
+    def test_list_is_served_from_cache(self):
+        """Test a repeated list request does not hit the database"""
+        self.client.get(self.list_url, {'ordering': 'price'})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, {'ordering': 'price'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_query_string_is_normalized(self):
+        """Test parameter order and unknown parameters share a cache entry"""
+        self.client.get(f"{self.list_url}?ordering=price&is_active=true")
+        with self.assertNumQueries(0):
+            self.client.get(f"{self.list_url}?is_active=true&utm_source=mail&ordering=price")
+
+    def test_service_writes_invalidate_cache(self):
+        """Test product service writes bump the catalog version"""
+        self.client.get(self.list_url)
+        version = get_catalog_version()
+        ProductService.update_product({'id': self.product.id, 'name': 'Renamed Phone'})
+        self.assertGreater(get_catalog_version(), version)
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data['results'][0]['name'], 'Renamed Phone')
+
+    def test_category_write_invalidates_cache(self):
+        """Test category views bump the catalog version"""
+        admin = CustomUser.objects.create_superuser(email='admin@example.com', password='AdminPassword123!')
+        self.client.force_authenticate(admin)
+        version = get_catalog_version()
+        response = self.client.patch(
+            reverse('category-detail', kwargs={'slug': self.category.slug}), {'name': 'Mobiles'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(get_catalog_version(), version)
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data['results'][0]['category']['name'], 'Mobiles')
+
+
+class CatalogQueryCountTest(APITestCase):
+    """Test catalog read endpoints use a fixed number of queries"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Phones', slug='phones')
+
+    def create_products(self, count, images_per_product=2):
+        start = Product.objects.count()
+        for index in range(start, start + count):
+            product = Product.objects.create(
+                name=f'Product {index}',
+                slug=f'product-{index}',
+                description='Description',
+                price=Decimal('10.00') + index,
+                stock_quantity=10,
+                category=self.category,
+            )
+            for image_index in range(images_per_product):
+                product.images.create(image_url=f'https://example.com/{index}/{image_index}.png')
+
+    def assertQueryCountStable(self, url, expected_queries):
+        for count in (1, 10):
+            self.create_products(count)
+            cache.clear()
+            with self.assertNumQueries(expected_queries):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_product_list_query_count(self):
+        """Test product list is a single query, images are not prefetched"""
+        self.assertQueryCountStable(reverse('product-list-create'), 1)
+
+    def test_product_detail_query_count(self):
+        """Test product detail costs ETag validator + product + images"""
+        self.create_products(1)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('product-detail', kwargs={'slug': 'product-0'}))
+        self.assertEqual(len(response.data['images']), 2)
+
+    def test_category_detail_query_count(self):
+        """Test category detail costs ETag validator + category + products page"""
+        self.assertQueryCountStable(reverse('category-detail', kwargs={'slug': self.category.slug}), 3)
+
+
+class CatalogLookupCacheTest(APITestCase):
+    """Test the in-process category lookups"""
+
+    def setUp(self):
+        cache.clear()
+        category_lookup_cache.clear()
+        self.client = APIClient()
+        admin = CustomUser.objects.create_superuser(email='admin@example.com', password='AdminPassword123!')
+        self.client.force_authenticate(admin)
+        self.category = Category.objects.create(name='Phones', slug='phones')
+        self.product = ProductService.create_product({
+            'name': 'Phone',
+            'slug': 'phone',
+            'description': 'A phone',
+            'price': Decimal('199.99'),
+            'stock_quantity': 5,
+            'category_id': self.category.id,
+        })
+
+    def test_category_lookups_are_cached(self):
+        """Test repeated category lookups by slug and ID skip the database"""
+        selectors.get_category_by_slug('phones')
+        selectors.get_category_by_id(self.category.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(selectors.get_category_by_slug('phones').id, self.category.id)
+            self.assertEqual(selectors.get_category_by_id(self.category.id).slug, 'phones')
+
+    def test_category_rename_and_delete_invalidate(self):
+        """Test renaming or deleting a category drops its cached entries"""
+        selectors.get_category_by_slug('phones')
+        response = self.client.patch(
+            reverse('category-detail', kwargs={'slug': 'phones'}), {'slug': 'mobiles'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(selectors.get_category_by_slug('phones'))
+        self.assertEqual(selectors.get_category_by_slug('mobiles').id, self.category.id)
+
+        self.client.delete(reverse('category-detail', kwargs={'slug': 'mobiles'}))
+        self.assertIsNone(selectors.get_category_by_slug('mobiles'))
+        self.assertIsNone(selectors.get_category_by_id(self.category.id))
+
+    def test_category_slug_filter(self):
+        """Test the category__slug filter matches through the cached lookup"""
+        url = reverse('product-list-create')
+        response = self.client.get(url, {'category__slug': 'phones'})
+        self.assertEqual([item['slug'] for item in response.data['results']], ['phone'])
+        response = self.client.get(url, {'category__slug': 'unknown'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_lookup_cache_is_bounded_and_expires(self):
+        """Test the least recently used entry is evicted and expired entries miss"""
+        lookups = LookupCache('test', maxsize=2, ttl=60)
+        lookups.set('a', 1)
+        lookups.set('b', 2)
+        lookups.get('a')
+        lookups.set('c', 3)
+        self.assertEqual((lookups.get('a'), lookups.get('b'), lookups.get('c')), (1, None, 3))
+
+        expired = LookupCache('test', ttl=0)
+        expired.set('a', 1)
+        self.assertIsNone(expired.get('a'))
+
+
+class CategoryTreeTest(APITestCase):
+    """Test nested categories stored with materialized paths"""
+
+    def setUp(self):
+        cache.clear()
+        category_lookup_cache.clear()
+        self.client = APIClient()
+        admin = CustomUser.objects.create_superuser(email='admin@example.com', password='AdminPassword123!')
+        self.client.force_authenticate(admin)
+        self.electronics = Category.objects.create(name='Electronics', slug='electronics')
+        self.phones = Category.objects.create(name='Phones', slug='phones', parent=self.electronics)
+        self.accessories = Category.objects.create(name='Accessories', slug='accessories', parent=self.phones)
+        self.garden = Category.objects.create(name='Garden', slug='garden')
+        for category in (self.electronics, self.phones, self.accessories, self.garden):
+            ProductService.create_product({
+                'name': f'{category.name} product',
+                'slug': f'{category.slug}-product',
+                'description': 'Description',
+                'price': Decimal('10.00'),
+                'stock_quantity': 1,
+                'category_id': category.id,
+            })
+
+    def list_slugs(self, **params):
+        response = self.client.get(reverse('product-list-create'), params)
+        return sorted(product['slug'] for product in response.data['results'])
+
+    def test_paths_follow_ancestors(self):
+        """Test each path is the parent's path followed by the category's padded ID"""
+        self.accessories.refresh_from_db()
+        self.assertEqual(
+            self.accessories.path,
+            f'{self.electronics.id:010d}/{self.phones.id:010d}/{self.accessories.id:010d}/',
+        )
+
+    def test_category_filter_includes_descendants(self):
+        """Test filtering by a category matches products of its whole subtree in one query"""
+        self.assertEqual(
+            self.list_slugs(category=self.electronics.id),
+            ['accessories-product', 'electronics-product', 'phones-product'],
+        )
+        self.assertEqual(self.list_slugs(category__slug='phones'), ['accessories-product', 'phones-product'])
+        self.assertEqual(self.list_slugs(category__slug='accessories'), ['accessories-product'])
+
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.client.get(reverse('product-list-create'), {'category__slug': 'phones'})
+
+    def test_move_reroots_subtree(self):
+        """Test moving a category rewrites the paths of its descendants"""
+        response = self.client.patch(
+            reverse('category-detail', kwargs={'slug': 'phones'}), {'parent': self.garden.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.accessories.refresh_from_db()
+        self.assertTrue(self.accessories.path.startswith(f'{self.garden.id:010d}/{self.phones.id:010d}/'))
+        self.assertEqual(self.list_slugs(category__slug='electronics'), ['electronics-product'])
+        self.assertEqual(
+            self.list_slugs(category__slug='garden'), ['accessories-product', 'garden-product', 'phones-product']
+        )
+
+    def test_category_filter_ignores_stale_lookup(self):
+        """Test the subtree filter uses the current path even where the lookup cache predates a move"""
+        stale = Category.objects.get(slug='phones')
+        self.client.patch(
+            reverse('category-detail', kwargs={'slug': 'phones'}), {'parent': self.garden.id}, format='json'
+        )
+        with patch.object(category_lookup_cache, 'get_or_load', return_value=stale):
+            self.assertEqual(self.list_slugs(category__slug='phones'), ['accessories-product', 'phones-product'])
+            self.assertEqual(self.list_slugs(category=self.electronics.id), ['electronics-product'])
+
+    def test_cannot_move_under_descendant(self):
+        """Test a category cannot become its own ancestor"""
+        response = self.client.patch(
+            reverse('category-detail', kwargs={'slug': 'electronics'}), {'parent': self.accessories.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with self.assertRaises(ValueError):
+            self.electronics.parent = self.electronics
+            self.electronics.save()
+
+    def test_tree_endpoint(self):
+        """Test the tree is nested from a single query and then served from the cache"""
+        url = reverse('category-tree')
+        response = self.client.get(url)
+        self.assertEqual([node['slug'] for node in response.data], ['electronics', 'garden'])
+        phones = response.data[0]['children'][0]
+        self.assertEqual((phones['slug'], phones['product_count']), ('phones', 1))
+        self.assertEqual([node['slug'] for node in phones['children']], ['accessories'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data, response.data)
+
+
+class ProductPrimaryImageTest(APITestCase):
+    """Test the denormalized primary image and the lightweight list representation"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.product = ProductService.create_product({
+            'name': 'Phone',
+            'slug': 'phone',
+            'description': 'A long description',
+            'price': Decimal('199.99'),
+            'stock_quantity': 5,
+            'category_id': category.id,
+        })
+        admin = CustomUser.objects.create_superuser(email='admin@example.com', password='AdminPassword123!')
+        self.client.force_authenticate(admin)
+
+    def test_list_omits_description_and_images(self):
+        """Test list items carry the primary image URL instead of description and images"""
+        ProductService.add_image_to_product(self.product, 'https://example.com/first.png')
+        item = self.client.get(reverse('product-list-create')).data['results'][0]
+        self.assertNotIn('description', item)
+        self.assertNotIn('images', item)
+        self.assertEqual(item['primary_image_url'], 'https://example.com/first.png')
+
+    def test_primary_image_follows_image_changes(self):
+        """Test adding, flagging and removing images keeps primary_image_url in sync"""
+        ProductService.add_image_to_product(self.product, 'https://example.com/first.png')
+        ProductService.add_image_to_product(self.product, 'https://example.com/second.png')
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.primary_image_url, 'https://example.com/first.png')
+
+        second = self.product.images.get(image_url='https://example.com/second.png')
+        self.client.patch(reverse('product-image-detail', kwargs={'pk': second.pk}), {'is_primary': True})
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.primary_image_url, 'https://example.com/second.png')
+
+        self.client.delete(reverse('product-image-detail', kwargs={'pk': second.pk}))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.primary_image_url, 'https://example.com/first.png')
+
+        self.client.delete(reverse('product-image-detail', kwargs={'pk': self.product.images.get().pk}))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.primary_image_url, '')
+
+    def test_image_detail_returns_image(self):
+        """Test the image detail endpoint serializes the image"""
+        ProductService.add_image_to_product(self.product, 'https://example.com/first.png')
+        image = self.product.images.get()
+        response = self.client.get(reverse('product-image-detail', kwargs={'pk': image.pk}))
+        self.assertEqual(response.data['image_url'], 'https://example.com/first.png')
+
+
+class SparseFieldsetTest(APITestCase):
+    """Test ?fields= and ?omit= on product endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        category = Category.objects.create(name='Phones', slug='phones')
+        for index in range(3):
+            product = ProductService.create_product({
+                'name': f'Phone {index}',
+                'slug': f'phone-{index}',
+                'description': 'A long description',
+                'price': Decimal('100.00') + index,
+                'stock_quantity': 5,
+                'category_id': category.id,
+            })
+            ProductService.add_image_to_product(product, f'https://example.com/{index}.png')
+
+    def test_fields_trims_output_and_columns(self):
+        """Test only the requested fields are serialized and selected, without the category join"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('product-list-create'), {'fields': 'name,price', 'ordering': 'price'})
+        self.assertEqual(response.data['results'][0], {'name': 'Phone 0', 'price': '100.00'})
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql']
+        self.assertNotIn('products_category', sql)
+        self.assertNotIn('stock_quantity', sql)
+
+    def test_cursor_pagination_with_fields(self):
+        """Test ordering columns stay loaded so cursors do not trigger extra queries"""
+        url = reverse('product-list-create')
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'fields': 'name', 'ordering': 'price', 'page_size': 2})
+        next_page = self.client.get(response.data['next'])
+        self.assertEqual([item['name'] for item in next_page.data['results']], ['Phone 2'])
+
+    def test_omit_skips_images_prefetch(self):
+        """Test omitting images on the detail endpoint skips the images query"""
+        url = reverse('product-detail', kwargs={'slug': 'phone-0'})
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'omit': 'images,description'})
+        self.assertNotIn('images', response.data)
+        self.assertNotIn('description', response.data)
+        self.assertEqual(response.data['category']['slug'], 'phones')
+
+    def test_fieldset_is_part_of_cache_key_and_etag(self):
+        """Test different field selections are cached and validated separately"""
+        url = reverse('product-detail', kwargs={'slug': 'phone-0'})
+        self.assertNotEqual(self.client.get(url)['ETag'], self.client.get(url, {'fields': 'name'})['ETag'])
+        list_url = reverse('product-list-create')
+        self.client.get(list_url)
+        self.assertEqual(set(self.client.get(list_url, {'fields': 'slug'}).data['results'][0]), {'slug'})
+
+
+class FastSerializerTest(APITestCase):
+    """Test the fast read-only serializers match the DRF serializers"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.product = ProductService.create_product({
+            'name': 'Phone',
+            'slug': 'phone',
+            'description': 'A phone',
+            'price': Decimal('199.9'),
+            'stock_quantity': 5,
+            'category_id': category.id,
+        })
+        ProductService.add_image_to_product(self.product, 'https://example.com/1.png')
+        ProductService.add_image_to_product(self.product, 'https://example.com/2.png')
+
+    def test_product_detail_matches_serializer(self):
+        """Test the detail endpoint returns exactly the ProductSerializer output"""
+        response = self.client.get(reverse('product-detail', kwargs={'slug': 'phone'}))
+        product = selectors.get_all_products().get(id=self.product.id)
+        self.assertEqual(response.content, JSONRenderer().render(ProductSerializer(product).data))
+
+    def test_benchmark_command_outputs_match(self):
+        """Test the serializer benchmark finds no divergence and leaves no rows behind"""
+        stdout = StringIO()
+        call_command('benchmark_serializers', sizes='1,3', repeat=1, stdout=stdout)
+        self.assertIn('matches', stdout.getvalue())
+        self.assertEqual(Product.objects.count(), 1)
+
+
+class ORJSONRendererTest(APITestCase):
+    """Test the orjson renderer and parser stay compatible with the stdlib ones"""
+
+    def test_render_matches_json_renderer(self):
+        """Test decimals, datetimes, unicode and line separators render to the same bytes"""
+        data = {
+            'price': Decimal('19.90'),
+            'ratio': Decimal('0.1'),
+            'created_at': timezone.now(),
+            'day': timezone.now().date(),
+            'name': 'Caf\u00e9 \u2028 \u2029 \U0001F600',
+            'nested': [{'id': 1, 'active': True, 'missing': None}],
+            'huge': 2 ** 70,
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_render_matches_json_renderer(self):
+        """Test indent requests fall back to the stdlib renderer"""
+        data = {'price': Decimal('1.50'), 'items': [1, 2]}
+        media_type = 'application/json; indent=4'
+        self.assertEqual(
+            ORJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type)
+        )
+
+    def test_parse_matches_json_parser(self):
+        """Test parsing returns the same data and rejects invalid JSON"""
+        content = '{"name": "Caf\u00e9", "price": 1.5, "items": [1, null]}'.encode('utf-8')
+        self.assertEqual(ORJSONParser().parse(BytesIO(content)), JSONParser().parse(BytesIO(content)))
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"price": NaN}'))
+
+    def test_product_list_response(self):
+        """Test API responses are rendered by the orjson renderer and request bodies parsed by the orjson parser"""
+        user = CustomUser.objects.create_superuser(email='admin@example.com', password='AdminPassword1!')
+        self.client.force_authenticate(user)
+        category = Category.objects.create(name='Phones', slug='phones')
+        response = self.client.post(reverse('product-list-create'), {
+            'name': 'Phone', 'slug': 'phone', 'description': 'A phone', 'price': '199.90',
+            'stock_quantity': 5, 'category_id': category.id,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_benchmark_command_outputs_match(self):
+        """Test the JSON benchmark finds no divergence and leaves no rows behind"""
+        stdout = StringIO()
+        call_command('benchmark_json', sizes='3', repeat=1, stdout=stdout)
+        self.assertIn('matches', stdout.getvalue())
+        self.assertEqual(Product.objects.count(), 0)
+
+
+class ProductKeysetPaginationTest(APITestCase):
+    """Test cursor pagination of the product list"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.list_url = reverse('product-list-create')
+        category = Category.objects.create(name='Phones', slug='phones')
+        for index in range(25):
+            Product.objects.create(
+                name=f'Product {index}',
+                slug=f'product-{index}',
+                description='Description',
+                price=Decimal('10.00') + index % 5,
+                stock_quantity=10,
+                category=category,
+            )
+
+    def collect_pages(self, url, params):
+        response = self.client.get(url, params)
+        pages = [response.data]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            pages.append(response.data)
+        return pages
+
+    def test_walks_every_product_once(self):
+        """Test following next links returns each product exactly once in order"""
+        pages = self.collect_pages(self.list_url, {'ordering': 'price', 'page_size': 10})
+        ids = [item['id'] for page in pages for item in page['results']]
+        expected = list(Product.objects.order_by('price', 'id').values_list('id', flat=True))
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(ids, expected)
+        self.assertNotIn('count', pages[0])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_previous_link_returns_prior_page(self):
+        """Test the previous link of the second page returns the first page"""
+        first = self.client.get(self.list_url, {'page_size': 10}).data
+        second = self.client.get(first['next']).data
+        previous = self.client.get(second['previous']).data
+        self.assertEqual(
+            [item['id'] for item in previous['results']],
+            [item['id'] for item in first['results']],
+        )
+        self.assertIsNone(previous['previous'])
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is rejected"""
+        response = self.client.get(self.list_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_is_bound_to_ordering(self):
+        """Test a cursor cannot be replayed with another ordering"""
+        first = self.client.get(self.list_url, {'ordering': 'price'}).data
+        cursor = parse_qs(urlparse(first['next']).query)['cursor'][0]
+        response = self.client.get(self.list_url, {'ordering': 'price', 'cursor': cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.list_url, {'ordering': 'name', 'cursor': cursor})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_opt_in(self):
+        """Test passing page falls back to page-number pagination"""
+        response = self.client.get(self.list_url, {'page': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 10)
+
+
+class ProductSearchTest(APITestCase):
+    """Test product search"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        category = Category.objects.create(name='Audio', slug='audio')
+        for name, description in [('Wireless Headphones', 'Noise cancelling'), ('Speaker', 'Bluetooth speaker')]:
+            Product.objects.create(
+                name=name,
+                slug=name.lower().replace(' ', '-'),
+                description=description,
+                price=Decimal('50.00'),
+                stock_quantity=3,
+                category=category,
+            )
+
+    def test_search_matches_name_and_description(self):
+        """Test search matches product name and description"""
+        url = reverse('product-list-create')
+        response = self.client.get(url, {'search': 'headphones'})
+        self.assertEqual([item['slug'] for item in response.data['results']], ['wireless-headphones'])
+        response = self.client.get(url, {'search': 'bluetooth'})
+        self.assertEqual([item['slug'] for item in response.data['results']], ['speaker'])
+
+    @skipUnless(connection.vendor == 'postgresql', "Ranked search needs PostgreSQL")
+    def test_pages_through_tied_ranks(self):
+        """Test cursor pages of ranked results return every product once when ranks tie"""
+        category = Category.objects.get(slug='audio')
+        for index in range(9):
+            Product.objects.create(
+                name='Studio Headphones', slug=f'studio-headphones-{index}', description='Closed back',
+                price=Decimal('80.00'), stock_quantity=3, category=category,
+            )
+        response = self.client.get(reverse('product-list-create'), {'search': 'studio', 'page_size': 4})
+        ids = [item['id'] for item in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            ids += [item['id'] for item in response.data['results']]
+        expected = Product.objects.filter(name='Studio Headphones').order_by('id').values_list('id', flat=True)
+        self.assertEqual(sorted(ids), list(expected))
+
+
+class ProductSuggestTest(APITestCase):
+    """Test the search-as-you-type suggestion endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('product-suggest')
+        category = Category.objects.create(name='Audio', slug='audio')
+        for name, is_active in [('Headphones', True), ('Wireless Headphones', True), ('Headset', False)]:
+            Product.objects.create(
+                name=name,
+                slug=name.lower().replace(' ', '-'),
+                description='',
+                price=Decimal('50.00'),
+                stock_quantity=3,
+                is_active=is_active,
+                category=category,
+            )
+
+    def test_suggests_active_products(self):
+        """Test suggestions only include active products, prefix matches first"""
+        response = self.client.get(self.url, {'q': 'head'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [{'name': 'Headphones', 'slug': 'headphones'}, {'name': 'Wireless Headphones', 'slug': 'wireless-headphones'}],
+        )
+
+    def test_short_query_returns_nothing(self):
+        """Test queries below the minimum length skip the database"""
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'q': 'h'})
+        self.assertEqual(response.data, [])
+
+    def test_limit(self):
+        """Test the limit parameter caps the number of suggestions"""
+        response = self.client.get(self.url, {'q': 'head', 'limit': 1})
+        self.assertEqual(len(response.data), 1)
+
+
+class ProductFacetsTest(APITestCase):
+    """Test the product facets endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('product-facets')
+        self.phones = Category.objects.create(name='Phones', slug='phones')
+        self.cases = Category.objects.create(name='Cases', slug='cases')
+        for index, (category, price, stock, is_active) in enumerate([
+            (self.phones, '199.00', 5, True),
+            (self.phones, '899.00', 0, True),
+            (self.phones, '49.00', 2, False),
+            (self.cases, '19.99', 10, True),
+            (self.cases, '24.99', 0, True),
+        ]):
+            ProductService.create_product({
+                'name': f'Product {index}',
+                'slug': f'product-{index}',
+                'description': 'Sturdy case' if category == self.cases else 'Smart phone',
+                'price': Decimal(price),
+                'stock_quantity': stock,
+                'is_active': is_active,
+                'category_id': category.id,
+            })
+
+    def test_fixed_route_slugs_are_reserved(self):
+        """Test a product cannot take a slug shadowed by a fixed route such as facets/"""
+        admin = CustomUser.objects.create_superuser(email='admin@example.com', password='AdminPassword123!')
+        self.client.force_authenticate(admin)
+        response = self.client.post(reverse('product-list-create'), {
+            'name': 'Facets', 'slug': 'facets', 'description': 'Shadowed', 'price': '10.00',
+            'stock_quantity': 1, 'category_id': self.phones.id,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('slug', response.data)
+
+    def test_facets_in_one_query(self):
+        """Test every facet is computed by a single aggregate query"""
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'is_active': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 4)
+        self.assertEqual(response.data['in_stock'], 2)
+        self.assertEqual(
+            [(category['slug'], category['count']) for category in response.data['categories']],
+            [('cases', 2), ('phones', 2)],
+        )
+        buckets = {bucket['min']: bucket['count'] for bucket in response.data['price_buckets']}
+        self.assertEqual(buckets['0.00'], 2)
+        self.assertEqual(buckets['100.00'], 1)
+        self.assertEqual(buckets['500.00'], 1)
+        self.assertIsNone(response.data['price_buckets'][-1]['max'])
+
+    def test_facets_apply_search(self):
+        """Test facets follow the same search filter as the product list"""
+        response = self.client.get(self.url, {'search': 'case'})
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual([category['slug'] for category in response.data['categories']], ['cases'])
+
+    def test_facets_are_cached_per_catalog_version(self):
+        """Test repeated requests are cached until the catalog changes"""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        ProductService.update_product({'id': Product.objects.get(slug='product-1').id, 'stock_quantity': 3})
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['in_stock'], 4)
+
+
+class ProductImportCommandTest(APITestCase):
+    """Test the import_products management command"""
+
+    def setUp(self):
+        cache.clear()
+        self.phones = Category.objects.create(name='Phones', slug='phones')
+        self.cases = Category.objects.create(name='Cases', slug='cases')
+        Product.objects.create(
+            name='Old name', slug='phone-1', description='', price=Decimal('1.00'),
+            stock_quantity=1, category=self.cases,
+        )
+
+    def write_file(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_csv_import_upserts_and_collects_errors(self):
+        """Test CSV rows are upserted by slug in batches and bad rows are reported"""
+        path = self.write_file('.csv', (
+            'name,slug,description,price,stock_quantity,is_active,category\n'
+            'Phone 1,phone-1,Flagship,699.00,5,true,phones\n'
+            'Phone 2,phone-2,,299.50,0,false,phones\n'
+            'Case 1,case-1,,19.99,100,,cases\n'
+            'Broken,broken,,abc,1,true,phones\n'
+            'Lost,lost,,5.00,1,true,missing\n'
+        ))
+        stdout, stderr = StringIO(), StringIO()
+        # Category map, two batches of one upsert each (inside a savepoint under the test transaction), count refresh
+        with self.assertNumQueries(8):
+            call_command('import_products', path, batch_size=2, stdout=stdout, stderr=stderr)
+
+        self.assertIn('Imported 3 of 5 rows with 2 errors', stdout.getvalue())
+        self.assertIn("line 5: Invalid price 'abc'", stderr.getvalue())
+        self.assertIn("line 6: Unknown category 'missing'", stderr.getvalue())
+
+        phone = Product.objects.get(slug='phone-1')
+        self.assertEqual((phone.name, phone.price, phone.category_id), ('Phone 1', Decimal('699.00'), self.phones.id))
+        self.assertFalse(Product.objects.get(slug='phone-2').is_active)
+        self.phones.refresh_from_db()
+        self.cases.refresh_from_db()
+        self.assertEqual((self.phones.product_count, self.phones.active_product_count), (2, 1))
+        self.assertEqual(self.cases.product_count, 1)
+
+    def test_jsonl_import_skip_existing(self):
+        """Test JSON Lines input and leaving existing products untouched"""
+        path = self.write_file('.jsonl', '\n'.join([
+            json.dumps({'name': 'Phone 1', 'slug': 'phone-1', 'price': 10, 'stock_quantity': 1, 'category': 'phones'}),
+            json.dumps({'name': 'Phone 3', 'slug': 'phone-3', 'price': '10.5', 'stock_quantity': 2, 'category': 'phones'}),
+            'not json',
+        ]))
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_products', path, skip_existing=True, stdout=stdout, stderr=stderr)
+
+        self.assertIn('Imported 1 of 3 rows', stdout.getvalue())
+        self.assertEqual(Product.objects.get(slug='phone-1').name, 'Old name')
+        self.assertEqual(Product.objects.get(slug='phone-3').price, Decimal('10.50'))
+        self.assertIn('line 3: Invalid JSON', stderr.getvalue())
+
+    def test_dry_run_writes_nothing(self):
+        """Test a dry run only validates the file"""
+        path = self.write_file('.csv', 'name,slug,price,stock_quantity,category\nPhone 9,phone-9,1.00,1,phones\n')
+        call_command('import_products', path, dry_run=True, stdout=StringIO())
+        self.assertFalse(Product.objects.filter(slug='phone-9').exists())
+
+
+class ProductExportTest(APITestCase):
+    """Test the streaming catalog export endpoint and command"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('product-export')
+        category = Category.objects.create(name='Phones', slug='phones')
+        for index in range(3):
+            product = Product.objects.create(
+                name=f'Phone {index}', slug=f'phone-{index}', description='Line one\nline two',
+                price=Decimal('10.50'), stock_quantity=index, category=category,
+            )
+            ProductImage.objects.create(product=product, image_url=f'https://example.com/{index}-a.jpg')
+            ProductImage.objects.create(product=product, image_url=f'https://example.com/{index}-b.jpg', is_primary=True)
+        ProductService.refresh_primary_image()
+        admin = CustomUser.objects.create_superuser(email='admin@example.com', password='AdminPassword123!')
+        self.client.force_authenticate(admin)
+
+    def test_requires_admin(self):
+        """Test anonymous users cannot export the catalog"""
+        self.client.force_authenticate(None)
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_ndjson_export(self):
+        """Test NDJSON export streams one object per product in a single query"""
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        with self.assertNumQueries(1):
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['slug'] for row in rows], ['phone-0', 'phone-1', 'phone-2'])
+        self.assertEqual(rows[0]['price'], '10.50')
+        self.assertEqual(rows[0]['category_slug'], 'phones')
+        self.assertEqual(rows[0]['primary_image_url'], 'https://example.com/0-b.jpg')
+
+    def test_csv_export(self):
+        """Test CSV export has a header and quotes multi-line descriptions"""
+        response = self.client.get(self.url, {'file_format': 'csv'})
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]['description'], 'Line one\nline two')
+
+    def test_unknown_format(self):
+        """Test an unsupported export format is rejected"""
+        response = self.client.get(self.url, {'file_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self):
+        """Test the export_products command writes NDJSON to stdout"""
+        stdout = StringIO()
+        call_command('export_products', stdout=stdout)
+        self.assertEqual(len(stdout.getvalue().splitlines()), 3)
+
+
+class ProductBulkUpdateTest(APITestCase):
+    """Test set-based bulk price and stock updates"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('product-bulk-update')
+        self.phones = Category.objects.create(name='Phones', slug='phones')
+        self.cases = Category.objects.create(name='Cases', slug='cases')
+        self.products = [
+            Product.objects.create(
+                name=f'Phone {index}', slug=f'phone-{index}', description='', price=Decimal('100.00'),
+                stock_quantity=10, category=self.phones,
+            )
+            for index in range(3)
+        ]
+        self.case = Product.objects.create(
+            name='Case', slug='case', description='', price=Decimal('20.00'), stock_quantity=10, category=self.cases,
+        )
+        CategoryService.refresh_product_counts()
+        admin = CustomUser.objects.create_superuser(email='admin@example.com', password='AdminPassword123!')
+        self.client.force_authenticate(admin)
+
+    def test_bulk_update_reports_row_errors(self):
+        """Test valid rows are applied in one UPDATE and failing rows are reported by position"""
+        version = get_catalog_version()
+        response = self.client.patch(self.url, {'items': [
+            {'id': self.products[0].id, 'price': '90.00'},
+            {'slug': 'phone-1', 'stock_quantity': 0, 'is_active': False},
+            {'slug': 'missing', 'price': '1.00'},
+            {'id': self.products[2].id, 'price': '-1'},
+            {'id': self.products[2].id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(sorted(error['item'] for error in response.data['errors']), [2, 3, 4])
+
+        self.products[0].refresh_from_db()
+        self.products[1].refresh_from_db()
+        self.assertEqual((self.products[0].price, self.products[0].stock_quantity), (Decimal('90.00'), 10))
+        self.assertEqual((self.products[1].price, self.products[1].stock_quantity), (Decimal('100.00'), 0))
+        self.assertFalse(self.products[1].is_active)
+        self.phones.refresh_from_db()
+        self.assertEqual(self.phones.active_product_count, 2)
+        self.assertNotEqual(get_catalog_version(), version)
+
+    def test_update_statement_count(self):
+        """Test the number of queries does not grow with the number of rows"""
+        items = [{'id': product.id, 'stock_quantity': 5} for product in self.products]
+        # Savepoint, one lookup, one CASE update, release
+        with self.assertNumQueries(4):
+            InventoryService.bulk_update_products(items)
+
+    def test_category_price_adjustments(self):
+        """Test percentage and absolute price adjustments per category"""
+        response = self.client.patch(self.url, {
+            'category_adjustments': [
+                {'category_id': self.phones.id, 'percentage': '-15'},
+                {'category_id': self.cases.id, 'amount': '-25.00'},
+                {'category_id': 999, 'amount': '1.00'},
+            ],
+            'items': [{'slug': 'phone-2', 'price': '50.00'}],
+        }, format='json')
+        self.assertEqual(response.data['adjusted'], 4)
+        self.assertEqual(response.data['errors'], [{'category_adjustment': 2, 'detail': 'Category does not exist'}])
+        self.assertEqual(
+            list(Product.objects.order_by('id').values_list('price', flat=True)),
+            [Decimal('85.00'), Decimal('85.00'), Decimal('50.00'), Decimal('0.00')],
+        )
+
+    def test_price_adjustment_overflow_is_reported(self):
+        """Test an adjustment pushing a price past the column limit is reported and skipped"""
+        Product.objects.filter(id=self.case.id).update(price=Decimal('99999990.00'))
+        response = self.client.patch(self.url, {
+            'category_adjustments': [
+                {'category_id': self.cases.id, 'percentage': '10'},
+                {'category_id': self.cases.id, 'amount': '9.99'},
+                {'category_id': self.cases.id, 'amount': '0.01'},
+                {'category_id': self.phones.id, 'percentage': '10'},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['adjusted'], 4)
+        self.assertEqual(
+            [error['category_adjustment'] for error in response.data['errors']], [0, 2],
+        )
+        self.case.refresh_from_db()
+        self.assertEqual(self.case.price, Decimal('99999999.99'))
+
+    def test_requires_admin(self):
+        """Test regular users cannot bulk update products"""
+        self.client.force_authenticate(None)
+        response = self.client.patch(self.url, {'items': []}, format='json')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+
+class CategoryProductCountTest(APITestCase):
+    """Test denormalized category product counts and the paginated category detail"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.phones = Category.objects.create(name='Phones', slug='phones')
+        self.tablets = Category.objects.create(name='Tablets', slug='tablets')
+        for index in range(12):
+            ProductService.create_product({
+                'name': f'Phone {index}',
+                'slug': f'phone-{index}',
+                'price': Decimal('100.00'),
+                'stock_quantity': 1,
+                'is_active': index % 4 != 0,
+                'category_id': self.phones.id,
+            })
+
+    def test_counts_follow_service_writes(self):
+        """Test create, update and delete keep category counts in sync"""
+        self.phones.refresh_from_db()
+        self.assertEqual((self.phones.product_count, self.phones.active_product_count), (12, 9))
+
+        product = Product.objects.get(slug='phone-1')
+        ProductService.update_product({'id': product.id, 'category_id': self.tablets.id})
+        ProductService.update_product({'id': Product.objects.get(slug='phone-0').id, 'is_active': True})
+        ProductService.delete_product({'id': Product.objects.get(slug='phone-2').id})
+
+        self.phones.refresh_from_db()
+        self.tablets.refresh_from_db()
+        self.assertEqual((self.phones.product_count, self.phones.active_product_count), (10, 8))
+        self.assertEqual((self.tablets.product_count, self.tablets.active_product_count), (1, 1))
+
+    def test_category_list_reads_counts_without_aggregation(self):
+        """Test the category list exposes counts with a single query"""
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('category-list-create'))
+        phones = next(item for item in response.data['results'] if item['slug'] == 'phones')
+        self.assertEqual(phones['product_count'], 12)
+        self.assertEqual(phones['active_product_count'], 9)
+
+    def test_category_detail_paginates_products(self):
+        """Test category detail embeds a page of products with a next link"""
+        url = reverse('category-detail', kwargs={'slug': 'phones'})
+        response = self.client.get(url)
+        self.assertEqual(response.data['product_count'], 12)
+        self.assertEqual(len(response.data['products']['results']), 10)
+        response = self.client.get(response.data['products']['next'])
+        self.assertEqual(len(response.data['products']['results']), 2)
+        self.assertIsNone(response.data['products']['next'])
+
+    def test_product_image_detail(self):
+        """Test image detail still serves the image"""
+        image = ProductImage.objects.create(
+            product=Product.objects.get(slug='phone-1'), image_url='https://example.com/phone-1.jpg'
+        )
+        response = self.client.get(reverse('product-image-detail', kwargs={'pk': image.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['image_url'], 'https://example.com/phone-1.jpg')
+
+
+class ConditionalGetTest(APITestCase):
+    """Test ETag / Last-Modified handling on catalog endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Phones', slug='phones')
+        self.product = ProductService.create_product({
+            'name': 'Phone',
+            'slug': 'phone',
+            'description': 'A phone',
+            'price': Decimal('199.99'),
+            'stock_quantity': 5,
+            'category_id': self.category.id,
+        })
+        self.urls = [
+            reverse('product-list-create'),
+            reverse('product-detail', kwargs={'slug': 'phone'}),
+            reverse('category-detail', kwargs={'slug': 'phones'}),
+        ]
+
+    def test_if_none_match_returns_304_without_serialization(self):
+        """Test a matching ETag is answered with at most a timestamp lookup"""
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertIn('ETag', response)
+            self.assertIn('Last-Modified', response)
+            with self.assertNumQueries(1 if url != self.urls[0] else 0):
+                not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(not_modified['ETag'], response['ETag'])
+
+    def test_if_modified_since(self):
+        """Test If-Modified-Since is honored"""
+        response = self.client.get(self.urls[1])
+        not_modified = self.client.get(self.urls[1], HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_catalog_change_invalidates_etag(self):
+        """Test ETags change after a catalog write"""
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        ProductService.add_image_to_product(self.product, 'https://example.com/phone.png')
+        for url, etag in zip(self.urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_product_is_404(self):
+        """Test unknown slugs skip conditional handling"""
+        response = self.client.get(reverse('product-detail', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third-party apps
     'rest_framework',
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
     'drf_spectacular',
 
     # Local apps
+    'apps.core',
     'apps.accounts',
     'apps.cart',
     'apps.orders',
@@ -53,6 +55,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.middleware.ReplicaPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -140,10 +143,16 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
+    # orjson-backed when orjson is installed, identical output to the stdlib JSON renderer/parser otherwise
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'apps.core.renderers.ORJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -176,6 +185,12 @@ JWT_COOKIE_SETTINGS = {
     'COOKIE_MAX_AGE': 60 * 60 * 24 * 7,
 }
 
+# Read replicas: aliases in DATABASES that serve views using ReplicaReadMixin (configured per environment),
+# and how long a user's reads stay on the primary after they write
+DATABASE_ROUTERS = ['apps.core.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DATABASE_REPLICA_PIN_SECONDS', '5'))
+
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', '')
@@ -183,3 +198,30 @@ STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY', '')
 STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET', '')
 
 STRIPE_CURRENCY = os.getenv('STRIPE_CURRENCY', 'usd')
+
+# Catalog cache settings (seconds a cached catalog response stays valid)
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', '300'))
+
+# In-process category lookups (entries per cache, seconds before an entry is reloaded,
+# whether misses fall through to the Django cache shared by every process)
+CATALOG_LOOKUP_CACHE_SIZE = int(os.getenv('CATALOG_LOOKUP_CACHE_SIZE', '1024'))
+CATALOG_LOOKUP_CACHE_TTL = int(os.getenv('CATALOG_LOOKUP_CACHE_TTL', '60'))
+CATALOG_LOOKUP_CACHE_SHARED = os.getenv('CATALOG_LOOKUP_CACHE_SHARED', 'False') == 'True'
+
+# Cart storage: 'database' writes every change to Cart/CartItem, 'cache' keeps live carts in the Django cache
+# and writes them behind (flush_carts command and checkout). Cached carts address lines by product ID.
+CART_BACKEND = os.getenv('CART_BACKEND', 'database')
+CART_CACHE_TIMEOUT = int(os.getenv('CART_CACHE_TIMEOUT', str(7 * 24 * 60 * 60)))
+# Abandoned carts: purge_carts deletes carts idle for CART_TTL_DAYS, and carts without items after
+# CART_EMPTY_TTL_DAYS, CART_PURGE_CHUNK_SIZE carts per transaction. Both TTLs must exceed CART_CACHE_TIMEOUT,
+# so a cart still live in the cache is never purged; the empty cart TTL defaults to one day above it.
+CART_TTL_DAYS = int(os.getenv('CART_TTL_DAYS', '30'))
+CART_EMPTY_TTL_DAYS = int(os.getenv('CART_EMPTY_TTL_DAYS', str(CART_CACHE_TIMEOUT // (24 * 60 * 60) + 1)))
+CART_PURGE_CHUNK_SIZE = int(os.getenv('CART_PURGE_CHUNK_SIZE', '500'))
+
+# Product name suggestions (search-as-you-type)
+PRODUCT_SUGGEST_MIN_LENGTH = 2
+PRODUCT_SUGGEST_MAX_RESULTS = 20
+
+# Lower bounds of the price histogram returned by the product facets endpoint
+PRODUCT_FACET_PRICE_BOUNDS = [0, 25, 50, 100, 250, 500, 1000]
@@ -28,6 +28,19 @@ DATABASES = {
     }
 }
 
+# Read replicas share the primary's credentials, one alias per host in DB_REPLICA_HOSTS
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+
+# API rendering: JSON only, the browsable API is a development tool
+REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+    'apps.core.renderers.ORJSONRenderer',
+]
+
 
 # Security settings
 SECURE_SSL_REDIRECT = True